@@ -1,23 +1,59 @@
 
+import functools
+import importlib
+import sys
 import streamlit as st
 from pathlib import Path
-from components.daily_entries import display_daily_entries_menu
-from components.inventory import display_meatball_inventory
-from components.reporting import generate_usage_report
-from components.move_forward import display_move_forward_menu
-from db.database import setup_database
+from components.perf_panel import perf_panel_enabled, display_perf_panel
+from db.database import setup_database, get_replica_status, force_replica_refresh
+from db.instrumentation import rerun, phase
 
+# Navigation label -> (module, function) of each page. A page's module (and
+# whatever it pulls in: pandas, matplotlib, graphviz) is only imported the
+# first time the page is shown; check_import_time.py keeps it that way.
+PAGES = {
+    "Daily Entries": ("components.daily_entries", "display_daily_entries_menu"),
+    "Meatball Inventory": ("components.inventory", "display_meatball_inventory"),
+    "Reports": ("components.reporting", "generate_usage_report"),
+    "Move Forward!": ("components.move_forward", "display_move_forward_menu"),
+}
+DEFAULT_PAGE = "Daily Entries"
 
 
 
 
 
-def main():
-    setup_database()
 
+def main():
     # Set page configuration
     st.set_page_config(page_title="Oy Companies Data System", layout="wide")
 
+    with rerun("Navigation") as record:
+        with phase("setup_database"):
+            setup_database()
+        render_app(record)
+        display_replica_status()
+        # After the page is drawn, so it never delays the first paint
+        start_precompute()
+
+    if perf_panel_enabled():
+        display_perf_panel()
+
+
+def start_precompute():
+    """
+    Start the background precomputation of the standard reports (once per process).
+    """
+    # Imported here so the report modules it needs stay out of app start-up.
+    from db.precompute import get_scheduler
+
+    get_scheduler()
+
+
+def render_app(record):
+    """
+    Render the navigation and the selected page.
+    """
     # Inject custom CSS for larger font
     inject_custom_css()
 
@@ -25,42 +61,69 @@ def main():
     st.title("Oy Companies Data System")
 
     # Navigation buttons
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        if st.button("Daily Entries"):
-            st.session_state["current_page"] = "Daily Entries"
-    with col2:
-        if st.button("Meatball Inventory"):
-            st.session_state["current_page"] = "Meatball Inventory"
-    with col3:
-        if st.button("Reports"):
-            st.session_state["current_page"] = "Reports"
-    with col4:
-        if st.button("Move Forward!"):
-            st.session_state["current_page"] = "Move Forward!"
+    for column, page in zip(st.columns(len(PAGES)), PAGES):
+        with column:
+            if st.button(page):
+                st.session_state["current_page"] = page
 
     # Default page setting
     if "current_page" not in st.session_state:
-        st.session_state["current_page"] = "Daily Entries"
+        st.session_state["current_page"] = DEFAULT_PAGE
 
     # Navigation logic
-    if st.session_state["current_page"] == "Daily Entries":
-        display_daily_entries_menu()
-    elif st.session_state["current_page"] == "Meatball Inventory":
-        display_meatball_inventory()
-    elif st.session_state["current_page"] == "Reports":
-        generate_usage_report()
-    elif st.session_state["current_page"] == "Move Forward!":
-        display_move_forward_menu()
-    else:
+    page = st.session_state["current_page"]
+    record["page"] = page
+    if page not in PAGES:
         st.error("Invalid menu selection.")
+        return
+    with phase(page):
+        load_page(page)()
+
+
+def load_page(page):
+    """
+    Return the render function of `page`, importing its module on first use.
+    """
+    module_name, function_name = PAGES[page]
+    if module_name not in sys.modules:
+        with phase(f"import {module_name}"):
+            importlib.import_module(module_name)
+    return getattr(sys.modules[module_name], function_name)
+
+def display_replica_status():
+    """
+    Show how far the local replica lags behind the primary, with a manual refresh.
+    """
+    status = get_replica_status()
+    if status is None:
+        return
+    if st.sidebar.button("Refresh data"):
+        try:
+            force_replica_refresh()
+            status = get_replica_status()
+        except Exception as e:
+            st.sidebar.error(f"Refresh failed: {e}")
+    if status["lag_seconds"] is None:
+        st.sidebar.caption("Local data has not been synced yet.")
+    else:
+        st.sidebar.caption(f"Local data synced {status['lag_seconds']:.0f}s ago.")
+    if status["last_error"]:
+        st.sidebar.caption(f"Last sync failed: {status['last_error']}")
+
+@functools.lru_cache(maxsize=16)
+def read_static(path, mtime):
+    """
+    Return the text of a static file; `mtime` in the key picks up edits.
+    """
+    return Path(path).read_text()
+
 
 def inject_custom_css():
     """Inject custom CSS into the app."""
     css_file = Path("style.css")
     if css_file.exists():
-        with open(css_file, "r") as f:
-            st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+        css = read_static(str(css_file), css_file.stat().st_mtime)
+        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,103 @@
+"""
+Import-time budget for app start-up and for opening each page.
+
+Runs `python -X importtime` in fresh interpreters and fails (exit 1) when
+
+- `import app` takes longer than the start-up budget, or pulls in a module
+  that should only load with a page (pandas, numpy, matplotlib, graphviz,
+  the page modules);
+- importing a page module on top of `app` takes longer than the page budget.
+
+    python check_import_time.py [--app-budget MS] [--page-budget MS] [--top N]
+
+Budgets default to IMPORT_BUDGET_APP_MS / IMPORT_BUDGET_PAGE_MS. Timings
+are best-of-`--runs` to smooth out a cold disk cache.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+from app import PAGES
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APP_BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_APP_MS", 2500))
+PAGE_BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_PAGE_MS", 1500))
+
+# Modules that must not be imported before a page needs them
+LAZY_MODULES = ["pandas", "numpy", "matplotlib", "graphviz", *sorted({module for module, _ in PAGES.values()})]
+
+
+def import_times(code):
+    """
+    Run `code` under -X importtime; return [(module, self_us, cumulative_us, depth)].
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{code!r} failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((module, int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def measure(code, runs):
+    """
+    Return (best total ms of the top-level imports, rows of that run), leaving
+    out what the interpreter imports on its own before running `code`.
+    """
+    startup = {module for module, _, _, _ in import_times("pass")}
+    best = None
+    for _ in range(runs):
+        rows = [row for row in import_times(code) if row[0] not in startup]
+        total = sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1000
+        if best is None or total < best[0]:
+            best = (total, rows)
+    return best
+
+
+def report(label, total, rows, budget, top):
+    status = "ok" if total <= budget else "OVER BUDGET"
+    print(f"{label}: {total:.0f} ms (budget {budget:.0f} ms) {status}")
+    for module, _, cumulative, _ in sorted(rows, key=lambda row: -row[2])[:top]:
+        print(f"    {cumulative / 1000:8.1f} ms  {module}")
+    return total <= budget
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check app start-up and page import times against a budget.")
+    parser.add_argument("--app-budget", type=float, default=APP_BUDGET_MS, help="ms allowed for `import app`")
+    parser.add_argument("--page-budget", type=float, default=PAGE_BUDGET_MS, help="ms allowed per page module")
+    parser.add_argument("--runs", type=int, default=3, help="runs per measurement; the fastest counts")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args(argv)
+
+    passed = True
+    total, rows = measure("import app", args.runs)
+    passed &= report("import app", total, rows, args.app_budget, args.top)
+
+    loaded = {module for module, _, _, _ in rows}
+    eager = [module for module in LAZY_MODULES if module in loaded]
+    if eager:
+        print(f"    imported at start-up but should load lazily: {', '.join(eager)}")
+        passed = False
+
+    for page, (module, _) in PAGES.items():
+        total, rows = measure(f"import app; import {module}", args.runs)
+        page_rows = [row for row in rows if row[0] not in loaded]
+        page_total = sum(cumulative for name, _, cumulative, depth in page_rows if depth == 0) / 1000
+        passed &= report(f"page {page!r} ({module})", page_total, page_rows, args.page_budget, args.top)
+
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,7 @@
 import streamlit as st
 from db.database import get_connection
-import sqlite3
 import math
+from db.instrumentation import timed
 
 
 def create_heart_progress_bar(current, goal, num_hearts=10):
@@ -24,7 +24,6 @@ def fetch_all_accounts():
     Fetch all accounts from the database.
     """
     with get_connection() as conn:
-        conn.row_factory = sqlite3.Row
         return conn.execute("SELECT * FROM accounts").fetchall()
 
 
@@ -53,6 +52,7 @@ def delete_account_from_db(account_id):
         conn.commit()
 
 
+@timed()
 def display_accounts_page():
     st.title("Accounts Management")
 
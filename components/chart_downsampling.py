@@ -0,0 +1,100 @@
+"""
+Downsampling of long daily series before they are charted.
+
+A chart is only so many pixels wide, so sending one point per day for a
+multi-year range just makes the browser (or matplotlib) draw points that
+land on top of each other. `downsample` keeps a chart at roughly
+`max_points` points whatever the range:
+
+- "bucket" (the default) sums the days into weeks or months, picking the
+  finest calendar bucket that fits, so the chart reads as weekly/monthly
+  totals;
+- "lttb" keeps the original daily points chosen by Largest-Triangle-
+  Three-Buckets, which preserves peaks and dips of each series.
+
+Set CHART_DOWNSAMPLING to pick the method and CHART_MAX_POINTS the budget.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+CHART_DOWNSAMPLING = os.environ.get("CHART_DOWNSAMPLING", "bucket")
+# About one point per two pixels of a full-width chart
+CHART_MAX_POINTS = int(os.environ.get("CHART_MAX_POINTS", 400))
+
+# Calendar buckets from finest to coarsest: (pandas frequency, label, days per bucket)
+BUCKETS = [
+    ("D", "Daily", 1),
+    ("W-MON", "Weekly", 7),
+    ("MS", "Monthly", 30.44),
+]
+
+
+def choose_bucket(start_date, end_date, max_points=CHART_MAX_POINTS):
+    """
+    Return (frequency, label) of the finest calendar bucket that keeps the
+    range within `max_points` points; monthly if nothing finer fits.
+    """
+    days = (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days + 1
+    for frequency, label, length in BUCKETS:
+        if days / length <= max_points:
+            return frequency, label
+    return BUCKETS[-1][:2]
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Return the indices of the `threshold` points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the point kept
+    from the previous bucket and the average of the next bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def downsample(frame, max_points=CHART_MAX_POINTS, method=CHART_DOWNSAMPLING):
+    """
+    Return (frame, label) with `frame` reduced to about `max_points` rows.
+
+    `frame` is indexed by date with one numeric column per series. `label`
+    describes the resolution shown ("Daily", "Weekly", "Monthly" or
+    "Sampled"). Frames that already fit are returned unchanged.
+    """
+    if len(frame) <= max_points:
+        return frame, "Daily"
+    frame = frame.set_axis(pd.to_datetime(frame.index))
+
+    if method == "lttb":
+        x = frame.index.to_numpy(dtype="datetime64[D]").astype(np.int64)
+        kept = set()
+        for column in frame.columns:
+            values = pd.to_numeric(frame[column], errors="coerce").fillna(0).to_numpy()
+            kept.update(lttb_indices(x, values, max(3, max_points // len(frame.columns))).tolist())
+        return frame.iloc[sorted(kept)], "Sampled"
+
+    frequency, label = choose_bucket(frame.index.min(), frame.index.max(), max_points)
+    totals = frame.apply(pd.to_numeric, errors="coerce").resample(frequency, label="left", closed="left").sum()
+    return totals, label
@@ -0,0 +1,132 @@
+"""
+Rendering of matplotlib charts to cached image bytes.
+
+Charts are drawn on the non-interactive Agg backend, saved to PNG (or SVG)
+bytes and the figure is closed straight away, so a long-running server
+holds no figures between reruns. The bytes are kept in a process-wide LRU
+cache keyed by a hash of the chart's data and options and bounded both in
+entries and in total bytes: showing the same report again is a dictionary
+lookup instead of a redraw.
+
+matplotlib and pandas are imported on first use, not when the app starts.
+"""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+
+class ChartCache:
+    """
+    LRU cache of rendered chart bytes, bounded by entry count and total size.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> image bytes
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def get(self, key):
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return image
+
+    def put(self, key, image):
+        if len(image) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+            self._entries[key] = image
+            self._bytes += len(image)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, oldest = self._entries.popitem(last=False)
+                self._bytes -= len(oldest)
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["entries"] = len(self._entries)
+            snapshot["bytes"] = self._bytes
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_rate"] = snapshot["hits"] / lookups if lookups else 0.0
+        return snapshot
+
+
+_cache = ChartCache()
+_pyplot = None
+
+
+def _get_pyplot():
+    """
+    Import pyplot on first use, selecting the Agg backend before it loads.
+    """
+    global _pyplot
+    if _pyplot is None:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot
+
+        _pyplot = matplotlib.pyplot
+    return _pyplot
+
+
+def get_chart_cache_stats():
+    return _cache.stats()
+
+
+def chart_key(kind, data, options, fmt):
+    """
+    Return a hash identifying a chart by its kind, data, options and image format.
+    """
+    import pandas as pd
+
+    digest = hashlib.sha256(f"{kind}\0{fmt}\0{sorted(options.items())!r}\0".encode())
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        columns = data.columns if isinstance(data, pd.DataFrame) else [data.name]
+        digest.update(repr(list(columns)).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    else:
+        digest.update(repr(data).encode())
+    return digest.hexdigest()
+
+
+def render_chart(kind, draw, data, options=None, fmt="png", figsize=(6.4, 4.8), dpi=100):
+    """
+    Return the image bytes of `draw(fig, ax, data, **options)`, from the cache when possible.
+
+    `kind` names the chart so different charts of the same data do not collide.
+    """
+    options = options or {}
+    key = chart_key(kind, data, options, fmt)
+    image = _cache.get(key)
+    if image is not None:
+        return image
+
+    plt = _get_pyplot()
+    fig, ax = plt.subplots(figsize=figsize, dpi=dpi)
+    try:
+        draw(fig, ax, data, **options)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, bbox_inches="tight")
+    finally:
+        plt.close(fig)
+    image = buffer.getvalue()
+    _cache.put(key, image)
+    return image
@@ -1,22 +1,125 @@
+import datetime
 import streamlit as st
-from components.daily_entries_barber import display_barber_form
-from components.daily_entries_shoe import display_shoes_form
-from components.daily_entries_meatball import display_meatball_form
+import pandas as pd
+from components.daily_entry_form import display_daily_entry_form
 from components.profit_report import display_profit_report
+from db.write_journal import get_journal, JOURNAL_DIR
+from db.database import get_connection
+from db.daily_entry_repository import save_daily_entries, saved_message
+from db.instrumentation import timed
+from db.report_queries import ENTRIES_BETWEEN
+from db.shops import SHOP_METRICS, SHOPS, get_shop
+
+# Grid column label -> (shop, metric)
+GRID_COLUMNS = {f"{shop}: {metric}": (shop, metric) for shop, metrics in SHOP_METRICS.items() for metric in metrics}
+GRID_MAX_DAYS = 62
 
 def display_daily_entries_menu():
     """
     Display the daily entries menu.
     """
     st.header("Daily Entries")
-    shop = st.selectbox("Select Shop", ["Barber Shop", "Shoe Shop", "Meatball Shop"])
+    mode = st.radio("Entry mode", ["Single day", "Multi-day grid"], horizontal=True)
+    if mode == "Multi-day grid":
+        display_entry_grid()
+        display_sync_status()
+        st.write("---")
+        display_profit_report()
+        return
+
+    shop = st.selectbox("Select Shop", [shop.name for shop in SHOPS])
+    display_daily_entry_form(get_shop(shop))
 
-    if shop == "Barber Shop":
-        display_barber_form()
-    elif shop == "Shoe Shop":
-        display_shoes_form()
-    elif shop == "Meatball Shop":
-        display_meatball_form()
+    display_sync_status()
 
     st.write("---")
     display_profit_report()
+
+
+def display_sync_status():
+    """
+    Show saves that are journaled locally but not yet written to the database.
+    """
+    journal = get_journal()
+    pending = journal.pending()
+    if pending:
+        st.caption(f"⏳ {pending} saved entr{'y is' if pending == 1 else 'ies are'} waiting to sync to the database.")
+        if journal.last_error:
+            st.caption(f"Last sync error: {journal.last_error}")
+    rejected = journal.rejected()
+    if rejected:
+        st.warning(f"{rejected} saved entr{'y was' if rejected == 1 else 'ies were'} rejected by the database. See {JOURNAL_DIR}.")
+
+
+@timed()
+def load_entry_grid(start_date, end_date):
+    """
+    Return a dates x shop-metric DataFrame of stored values, read in one range query.
+    """
+    with get_connection() as conn:
+        rows = conn.execute(ENTRIES_BETWEEN, (start_date.isoformat(), end_date.isoformat())).fetchall()
+
+    dates = [(start_date + datetime.timedelta(days=offset)).isoformat()
+             for offset in range((end_date - start_date).days + 1)]
+    if rows:
+        entries = pd.DataFrame([tuple(row) for row in rows], columns=["date", "shop", "metric", "value"])
+        entries["column"] = entries["shop"] + ": " + entries["metric"]
+        grid = entries.pivot_table(index="date", columns="column", values="value", aggfunc="first")
+    else:
+        grid = pd.DataFrame()
+    grid = grid.reindex(index=dates, columns=list(GRID_COLUMNS)).astype("Float64")
+    grid.index.name = "Date"
+    return grid
+
+
+def grid_changes(original, edited):
+    """
+    Return (date, shop, metric, value) rows for the cells that differ between two grids.
+
+    Cleared cells are ignored: the grid adds and corrects entries, it does not delete them.
+    """
+    changes = []
+    for column, (shop, metric) in GRID_COLUMNS.items():
+        before = pd.to_numeric(original[column], errors="coerce").astype(float)
+        after = pd.to_numeric(edited[column], errors="coerce").astype(float)
+        changed = after.notna() & (before.isna() | before.ne(after))
+        changes.extend((date, shop, metric, int(value)) for date, value in after[changed].items())
+    return changes
+
+
+@timed()
+def display_entry_grid():
+    """
+    Spreadsheet-style entry for every shop over several days, saved in one transaction.
+    """
+    st.subheader("Multi-day Entry")
+    today = datetime.date.today()
+    col1, col2 = st.columns(2)
+    with col1:
+        start_date = st.date_input("From", value=today - datetime.timedelta(days=6), key="grid_start_date")
+    with col2:
+        end_date = st.date_input("To", value=today, key="grid_end_date")
+    if end_date < start_date:
+        st.error("The end date must not be before the start date.")
+        return
+    if (end_date - start_date).days >= GRID_MAX_DAYS:
+        st.error(f"Pick at most {GRID_MAX_DAYS} days at a time.")
+        return
+
+    original = load_entry_grid(start_date, end_date)
+    edited = st.data_editor(
+        original,
+        key=f"entry_grid_{start_date}_{end_date}",
+        num_rows="fixed",
+        use_container_width=True,
+        column_config={column: st.column_config.NumberColumn(min_value=0, step=1) for column in GRID_COLUMNS},
+    )
+    changes = grid_changes(original, edited)
+    st.caption(f"{len(changes)} changed cell{'' if len(changes) == 1 else 's'}.")
+
+    if st.button("Save changes", disabled=not changes):
+        try:
+            counts = save_daily_entries(changes)
+            st.success(f"Saved {len(changes)} cell{'' if len(changes) == 1 else 's'}. {saved_message(counts)}")
+        except Exception as e:
+            st.error(f"Failed to save the grid. Error: {str(e)}")
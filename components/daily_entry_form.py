@@ -0,0 +1,32 @@
+import datetime
+import streamlit as st
+import pandas as pd
+from db.daily_entry_repository import save_daily_entries, saved_message
+from db.profit_engine import add_profit_columns
+
+
+def display_daily_entry_form(shop):
+    """
+    Daily entry form for any shop in the registry.
+    """
+    st.subheader(f"{shop.name} Daily Entry")
+    date = st.date_input(f"Date for {shop.name} Entry", value=datetime.date.today())
+    values = {
+        metric: st.number_input(metric.label, min_value=0, step=1, key=f"entry_{shop.name}_{metric.name}")
+        for metric in shop.metrics
+    }
+
+    # Preview the day's profit with the prices in effect on that date
+    preview = add_profit_columns(pd.DataFrame([{
+        "date": date.isoformat(),
+        "shop": shop.name,
+        **{metric.column: value for metric, value in values.items()},
+    }]))
+    st.caption(f"Profit for this day: ฿{preview['profit'].iloc[0]:,}")
+
+    if st.button(f"Save {shop.name} Entry"):
+        try:
+            counts = save_daily_entries([(date, shop.name, metric.name, value) for metric, value in values.items()])
+            st.success(f"{shop.name} entries for {date} saved successfully! {saved_message(counts)}")
+        except Exception as e:
+            st.error(f"Failed to save entries for {date}. Error: {str(e)}")
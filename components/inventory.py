@@ -1,5 +1,10 @@
 import streamlit as st
 from db.database import get_connection
+from db.precompute import get_precomputed
+from db.report_queries import WEEKLY_INVENTORY_USAGE, WEEKLY_TRACKING_STATUS
+from db.write_journal import journal_write
+from db.write_queries import UPSERT_WEEKLY_INVENTORY, MARK_WEEK_START_COUNTED, MARK_WEEK_END_COUNTED
+from db.instrumentation import timed
 
 def display_meatball_inventory():
     """
@@ -20,6 +25,7 @@ def display_meatball_inventory():
         view_completed_weeks()
 
 
+@timed()
 def manage_inventory_items():
     """
     Manage inventory items with options to add, view, and edit items.
@@ -73,6 +79,7 @@ def manage_inventory_items():
             st.warning("No items found. Add items first.")
 
 
+@timed()
 def set_inventory():
     """
     Allow users to set start or end weekly inventory for all items.
@@ -95,7 +102,9 @@ def set_inventory():
         return
 
     with st.form("weekly_inventory_form"):
-        st.write(f"### {inventory_type_label} Inventory for Week {record_date.isocalendar()[1]}, {record_date.year}")
+        # Weeks belong to their ISO year: Monday 2024-12-30 starts week 1 of 2025
+        year, week_number, _ = record_date.isocalendar()
+        st.write(f"### {inventory_type_label} Inventory for Week {week_number}, {year}")
         quantities = {}
         for item in items:
             item_id = item["id"]
@@ -104,51 +113,33 @@ def set_inventory():
 
         submitted = st.form_submit_button("Save Inventory")
         if submitted:
-            week_number = record_date.isocalendar()[1]
-            year = record_date.year
-
-            with get_connection() as conn:
-                try:
-                    for item_id, quantity in quantities.items():
-                        conn.execute("""
-                            INSERT INTO weekly_inventory (item_id, inventory_type, quantity, record_date, week_number, year)
-                            VALUES (?, ?, ?, ?, ?, ?)
-                            ON CONFLICT (item_id, inventory_type, week_number, year)
-                            DO UPDATE SET quantity = excluded.quantity, record_date = excluded.record_date
-                        """, (item_id, inventory_type, quantity, record_date, week_number, year))
-
-                    if inventory_type == "start":
-                        conn.execute("""
-                            INSERT OR IGNORE INTO weekly_tracking (week_number, year, start_inventory)
-                            VALUES (?, ?, 1)
-                            ON CONFLICT (week_number, year)
-                            DO UPDATE SET start_inventory = 1
-                        """, (week_number, year))
-                    elif inventory_type == "end":
-                        conn.execute("""
-                            INSERT OR IGNORE INTO weekly_tracking (week_number, year, end_inventory)
-                            VALUES (?, ?, 1)
-                            ON CONFLICT (week_number, year)
-                            DO UPDATE SET end_inventory = 1
-                        """, (week_number, year))
-
-                    conn.commit()
-                    st.success(f"{inventory_type_label} inventory saved successfully for Week {week_number}, {year}!")
-                except Exception as e:
-                    st.error(f"Error saving inventory: {str(e)}")
-
-
+            try:
+                mark_week = MARK_WEEK_START_COUNTED if inventory_type == "start" else MARK_WEEK_END_COUNTED
+                journal_write([
+                    (UPSERT_WEEKLY_INVENTORY, [
+                        (item_id, inventory_type, quantity, record_date, week_number, year)
+                        for item_id, quantity in quantities.items()
+                    ]),
+                    (mark_week, [(week_number, year)]),
+                ])
+                st.success(f"{inventory_type_label} inventory saved successfully for Week {week_number}, {year}!")
+            except Exception as e:
+                st.error(f"Error saving inventory: {str(e)}")
+
+
+@timed()
 def view_completed_weeks():
     """
     Display completed weeks and allow the user to view inventory usage reports.
     """
     st.write("### Completed Weeks")
-    with get_connection() as conn:
-        weekly_tracking = conn.execute("""
-            SELECT week_number, year, start_inventory, end_inventory
-            FROM weekly_tracking
-            ORDER BY year, week_number
-        """).fetchall()
+    precomputed = get_precomputed("completed_weeks")
+    if precomputed is not None:
+        weekly_tracking = precomputed.records()
+        st.caption(f"As of {precomputed.computed_at}")
+    else:
+        with get_connection() as conn:
+            weekly_tracking = conn.execute(WEEKLY_TRACKING_STATUS).fetchall()
 
     if not weekly_tracking:
         st.info("No weekly inventory data available.")
@@ -162,50 +153,44 @@ def view_completed_weeks():
             if start_inventory and end_inventory:
                 button_label = f"✅ Week {week_number}, {year}"
                 if st.button(button_label, key=f"week_{week_number}_{year}"):
-                    generate_inventory_usage_report(week_number, year)
+                    generate_inventory_usage_report(record["iso_week_key"], week_number, year)
             else:
                 st.write(f"❌ Week {week_number}, {year} - Incomplete")
 
 
-def generate_inventory_usage_report(week_number, year):
+@timed()
+def generate_inventory_usage_report(iso_week_key, week_number, year):
     """
     Generate and display a usage report for a specific week.
     """
     st.subheader(f"Usage Report for Week {week_number}, {year}")
 
-    with get_connection() as conn:
-        start_inventory = conn.execute("""
-            SELECT ii.name, ii.cost, wi.quantity
-            FROM weekly_inventory wi
-            JOIN inventory_items ii ON wi.item_id = ii.id
-            WHERE wi.inventory_type = 'start' AND wi.week_number = ? AND wi.year = ?
-        """, (week_number, year)).fetchall()
-
-        end_inventory = conn.execute("""
-            SELECT ii.name, ii.cost, wi.quantity
-            FROM weekly_inventory wi
-            JOIN inventory_items ii ON wi.item_id = ii.id
-            WHERE wi.inventory_type = 'end' AND wi.week_number = ? AND wi.year = ?
-        """, (week_number, year)).fetchall()
-
-        if not start_inventory or not end_inventory:
-            st.warning("Incomplete inventory records for this week.")
-            return
-
-        usage_report = []
-        total_cost = 0
-        for start_item in start_inventory:
-            for end_item in end_inventory:
-                if start_item["name"] == end_item["name"]:
-                    amount_used = start_item["quantity"] - end_item["quantity"]
-                    cost = int(amount_used * start_item["cost"])
-                    usage_report.append({
-                        "Name": start_item["name"],
-                        "Amount Used": round(amount_used, 1),
-                        "Unit Cost": int(start_item["cost"]),
-                        "Total Cost": int(cost)
-                    })
-                    total_cost += cost
-
-        st.table(usage_report)
-        st.write(f"**Total Cost for Week {week_number}, {year}: ฿{int(total_cost)}**")
+    # The last completed week is usually precomputed already
+    precomputed = get_precomputed("inventory_usage", (iso_week_key,))
+    try:
+        if precomputed is not None:
+            rows = precomputed.records()
+        else:
+            with get_connection() as conn:
+                rows = conn.execute(WEEKLY_INVENTORY_USAGE, (iso_week_key,)).fetchall()
+    except Exception as e:
+        st.error(f"Failed to load inventory for this week: {str(e)}")
+        return
+
+    # Items need both a start and an end count; the join drops the others
+    if not rows:
+        st.warning("Incomplete inventory records for this week.")
+        return
+
+    usage_report = [{
+        "Name": row["name"],
+        "Amount Used": round(row["amount_used"], 1),
+        "Unit Cost": int(row["cost"]),
+        "Total Cost": int(row["total_cost"])
+    } for row in rows]
+    total_cost = sum(item["Total Cost"] for item in usage_report)
+
+    st.table(usage_report)
+    st.write(f"**Total Cost for Week {week_number}, {year}: ฿{int(total_cost)}**")
+    if precomputed is not None:
+        st.caption(f"As of {precomputed.computed_at}")
@@ -0,0 +1,61 @@
+import os
+import streamlit as st
+from components.chart_renderer import get_chart_cache_stats
+from db.database import get_pool_stats, get_cache_stats
+from db.instrumentation import recent_reruns, SLOW_QUERY_MS, PERF_LOG_PATH
+
+
+def perf_panel_enabled():
+    """
+    The panel is shown with PERF_DEBUG=1 or by opening the app with ?debug=perf.
+    """
+    return os.environ.get("PERF_DEBUG") == "1" or st.query_params.get("debug") == "perf"
+
+
+def display_perf_panel():
+    """
+    Sidebar breakdown of the last reruns: time per component and per query.
+    """
+    reruns = recent_reruns()
+    with st.sidebar.expander("⏱ Performance", expanded=False):
+        if not reruns:
+            st.write("No reruns recorded yet.")
+            return
+
+        st.dataframe([
+            {
+                "Page": record["page"],
+                "Total (ms)": record["total_ms"],
+                "DB (ms)": record["db_ms"],
+                "Queries": record["query_count"],
+                "Cached": sum(1 for query in record["queries"] if query["cached"]),
+            }
+            for record in reruns
+        ], use_container_width=True)
+
+        labels = [f"#{i + 1} {record['page']} ({record['total_ms']:.0f} ms)" for i, record in enumerate(reruns)]
+        selected = st.selectbox("Rerun", range(len(reruns)), format_func=lambda i: labels[i], key="perf_panel_rerun")
+        record = reruns[selected]
+
+        st.write("**Components**")
+        st.dataframe(
+            [{"Component": "  " * p["depth"] + p["component"], "ms": p["ms"]} for p in reversed(record["phases"])],
+            use_container_width=True,
+        )
+
+        st.write(f"**Queries** (slow ≥ {SLOW_QUERY_MS:.0f} ms)")
+        st.dataframe(
+            [
+                {"Component": q["component"], "Op": q["op"], "ms": q["ms"], "Rows": q["rows"], "Cached": q["cached"], "SQL": q["sql"]}
+                for q in record["queries"]
+            ],
+            use_container_width=True,
+        )
+
+        st.write("**Connection pool**")
+        st.json(get_pool_stats())
+        st.write("**Query cache**")
+        st.json(get_cache_stats())
+        st.write("**Chart cache**")
+        st.json(get_chart_cache_stats())
+        st.caption(f"Full log: {PERF_LOG_PATH}")
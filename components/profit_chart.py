@@ -1,16 +1,18 @@
-import matplotlib.pyplot as plt
 import streamlit as st
+from components.chart_downsampling import downsample
+from components.chart_renderer import render_chart
+from db.instrumentation import timed
+from db.shops import SHOPS_BY_NAME
 
-def generate_profit_pie_chart(barber_profit, shoe_profit, meatball_profit):
-    """
-    Generate and display a pie chart for profit breakdown with absolute values.
-    """
-    labels = ['Barber Shop', 'Shoe Shop', 'Meatball Stand']
-    sizes = [barber_profit, shoe_profit, meatball_profit]
-    colors = ['#ff9999', '#66b3ff', '#99ff99']
-    explode = (0.1, 0, 0)  # explode the first slice
 
-    fig, ax = plt.subplots()
+def _draw_pie(fig, ax, profits):
+    labels = list(profits)
+    sizes = list(profits.values())
+    colors = [SHOPS_BY_NAME[shop].color if shop in SHOPS_BY_NAME else None for shop in labels]
+    if None in colors:
+        colors = None  # let matplotlib pick when a shop has no configured colour
+    explode = [0.1] + [0] * (len(labels) - 1)  # explode the first slice
+
     wedges, texts, autotexts = ax.pie(
         sizes, explode=explode, labels=labels, colors=colors,
         autopct=lambda p: f'{int(p * sum(sizes) / 100):,} ฿', startangle=90
@@ -23,21 +25,41 @@ def generate_profit_pie_chart(barber_profit, shoe_profit, meatball_profit):
     for autotext in autotexts:
         autotext.set_fontsize(12)
 
-    st.pyplot(fig)
 
-def generate_profit_line_chart(data, start_date, end_date):
+def _draw_line(fig, ax, wide, title, ylabel):
+    for shop in wide.columns:
+        ax.plot(wide.index, wide[shop].to_numpy(), label=shop)
+    fig.autofmt_xdate()
+
+    ax.set_title(title)
+    ax.set_xlabel("Date")
+    ax.set_ylabel(ylabel)
+    ax.legend()
+
+
+@timed()
+def generate_profit_pie_chart(profits):
     """
-    Generate and display a line chart for profit over time.
+    Generate and display a pie chart for profit breakdown with absolute values.
+
+    `profits` maps shop name to profit, in registry order.
     """
-    fig, ax = plt.subplots()
+    st.image(render_chart("profit_pie", _draw_pie, profits))
 
-    for shop, profits in data.items():
-        dates = list(profits.keys())
-        values = list(profits.values())
-        ax.plot(dates, values, label=shop)
+@timed()
+def generate_profit_line_chart(series, start_date, end_date, full_resolution=False):
+    """
+    Generate and display a line chart for profit over time.
 
-    ax.set_title(f"Profit Trends ({start_date} to {end_date})")
-    ax.set_xlabel("Date")
-    ax.set_ylabel("Profit (฿)")
-    ax.legend()
-    st.pyplot(fig)
+    `series` is a tidy (date, shop, profit) DataFrame from `profit_series`;
+    long ranges are plotted as weekly or monthly totals unless `full_resolution`.
+    """
+    wide = series.pivot(index="date", columns="shop", values="profit")
+    resolution = "Daily"
+    if not full_resolution:
+        wide, resolution = downsample(wide)
+
+    st.image(render_chart("profit_line", _draw_line, wide, {
+        "title": f"Profit Trends ({start_date} to {end_date})",
+        "ylabel": "Profit (฿)" if resolution in ("Daily", "Sampled") else f"{resolution} Profit (฿)",
+    }))
@@ -1,8 +1,15 @@
 import streamlit as st
+import pandas as pd
 from components.profit_chart import generate_profit_pie_chart, generate_profit_line_chart
-from db.database import get_connection
+from db.concurrent import run_queries
+from db.precompute import get_precomputed
+from db.report_queries import DAILY_PROFIT_BETWEEN, PROFIT_TOTALS_BETWEEN
+from db.profit_engine import profit_series
+from db.shops import SHOPS
 import datetime
+from db.instrumentation import timed
 
+@timed()
 def display_profit_report():
     """
     Generate and display a profit report based on a date range.
@@ -24,117 +31,51 @@ def display_profit_report():
 
     # Chart type selector for multi-day ranges
     chart_type = None
+    full_resolution = False
     if start_date != end_date:
         chart_type = st.radio("Select Chart Type:", ["Pie Chart", "Line Chart"], horizontal=True)
+        if chart_type == "Line Chart":
+            full_resolution = st.toggle("Full resolution", value=False, key="profit_full_resolution",
+                                        help="Long ranges are charted as weekly or monthly totals unless this is on.")
     else:
         st.write("Single-day range: Displaying only a pie chart.")
 
     # Generate report button
     if st.button("Generate Report"):
-        # Fetch data from database
-        with get_connection() as conn:
-            barber_data = conn.execute("""
-                SELECT date, metric, value FROM daily_entries
-                WHERE shop = 'Barber Shop' AND date BETWEEN ? AND ?
-            """, (start_date, end_date)).fetchall()
-
-            shoe_data = conn.execute("""
-                SELECT date, value FROM daily_entries
-                WHERE shop = 'Shoe Shop' AND metric = 'Revenue' AND date BETWEEN ? AND ?
-            """, (start_date, end_date)).fetchall()
-
-            meatball_data = conn.execute("""
-                SELECT date, metric, value FROM daily_entries
-                WHERE shop = 'Meatball Stand' AND date BETWEEN ? AND ?
-            """, (start_date, end_date)).fetchall()
-
-        # Calculate profits
-        barber_profit = calculate_barber_profit(barber_data)
-        shoe_profit = calculate_shoe_profit(shoe_data)
-        meatball_profit = calculate_meatball_profit(meatball_data)
+        # Totals (and the daily series for the line chart) are aggregated in SQL;
+        # today's and yesterday's totals are usually precomputed already
+        precomputed = get_precomputed("profit_totals", (str(start_date), str(end_date)))
+        queries = {}
+        if precomputed is None:
+            queries["totals"] = (PROFIT_TOTALS_BETWEEN, (start_date, end_date))
+        if chart_type == "Line Chart":
+            queries["daily"] = (DAILY_PROFIT_BETWEEN, (start_date, end_date))
+        try:
+            results = run_queries(queries) if queries else {}
+        except Exception as e:
+            st.error(f"Failed to load profit data: {str(e)}")
+            return
+        totals_rows = precomputed.records() if precomputed is not None else results["totals"]
+        totals = {row["shop"]: row["profit"] for row in totals_rows}
+        profits = {shop.name: totals.get(shop.name, 0) for shop in SHOPS}
 
         # Display total profits
-        st.write(f"Barber Shop Profit: ฿{barber_profit}")
-        st.write(f"Shoe Shop Profit: ฿{shoe_profit}")
-        st.write(f"Meatball Stand Profit: ฿{meatball_profit}")
+        for shop, profit in profits.items():
+            st.write(f"{shop} Profit: ฿{profit}")
 
-        total_profit = barber_profit + shoe_profit + meatball_profit
+        total_profit = sum(profits.values())
         st.write(f"**Total Profit: ฿{total_profit}**")
+        if precomputed is not None:
+            st.caption(f"As of {precomputed.computed_at}")
 
         # Chart rendering
         if start_date == end_date:
-            generate_profit_pie_chart(barber_profit, shoe_profit, meatball_profit)
+            generate_profit_pie_chart(profits)
         else:
             if chart_type == "Pie Chart":
-                generate_profit_pie_chart(barber_profit, shoe_profit, meatball_profit)
+                generate_profit_pie_chart(profits)
             elif chart_type == "Line Chart":
-                line_data = prepare_line_chart_data(barber_data, shoe_data, meatball_data)
-                generate_profit_line_chart(line_data, start_date, end_date)
-
-def calculate_barber_profit(data):
-    """
-    Calculate profit for the Barber Shop.
-    """
-    adult_price = 120
-    child_price = 80
-    free_price = 0
-
-    adult_haircuts = sum(row["value"] for row in data if row["metric"] == "Adult Haircuts")
-    child_haircuts = sum(row["value"] for row in data if row["metric"] == "Child Haircuts")
-    free_haircuts = sum(row["value"] for row in data if row["metric"] == "Free Haircuts")
-
-    revenue = (adult_haircuts * adult_price) + (child_haircuts * child_price) + (free_haircuts * free_price)
-    cost = 260
-    return revenue // 2 - cost
-
-def calculate_shoe_profit(data):
-    """
-    Calculate profit for the Shoe Shop.
-    """
-    revenue = sum(row["value"] for row in data)
-    cost = 110
-    return revenue - cost
-
-def calculate_meatball_profit(data):
-    """
-    Calculate profit for the Meatball Stand.
-    """
-    sales = sum(row["value"] for row in data if row["metric"] == "Sales")
-    salad_cost = sum(row["value"] for row in data if row["metric"] == "Salad Cost")
-    return sales // 2 - salad_cost - 200
-
-def prepare_line_chart_data(barber_data, shoe_data, meatball_data):
-    """
-    Prepare data for the line chart.
-    """
-    line_data = {
-        "Barber Shop": {},
-        "Shoe Shop": {},
-        "Meatball Stand": {}
-    }
-
-    for row in barber_data:
-        date = row["date"]
-        profit = calculate_barber_profit([row])
-        if date in line_data["Barber Shop"]:
-            line_data["Barber Shop"][date] += profit
-        else:
-            line_data["Barber Shop"][date] = profit
-
-    for row in shoe_data:
-        date = row["date"]
-        profit = calculate_shoe_profit([row])
-        if date in line_data["Shoe Shop"]:
-            line_data["Shoe Shop"][date] += profit
-        else:
-            line_data["Shoe Shop"][date] = profit
-
-    for row in meatball_data:
-        date = row["date"]
-        profit = calculate_meatball_profit([row])
-        if date in line_data["Meatball Stand"]:
-            line_data["Meatball Stand"][date] += profit
-        else:
-            line_data["Meatball Stand"][date] = profit
+                daily_profits = pd.DataFrame([tuple(row) for row in results["daily"]], columns=["date", "shop", "profit"])
+                series = profit_series(daily_profits, start_date, end_date)
+                generate_profit_line_chart(series, start_date, end_date, full_resolution)
 
-    return line_data
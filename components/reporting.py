@@ -1,6 +1,14 @@
+import functools
 import streamlit as st
 import pandas as pd  # Add this import
+from components.chart_downsampling import downsample
 from db.database import get_connection
+from db.precompute import get_precomputed
+from db.report_builder import Report
+from db.report_export import FORMATS, export_bytes, export_formats
+from db.report_queries import WEEKLY_PROFIT_VS_INVENTORY
+from db.instrumentation import timed
+from db.shops import SHOPS, get_shop
 
 def date_range_input(label_start, label_end):
     """
@@ -18,37 +26,108 @@ def multiselect_input(options):
     return st.multiselect("Select series to display:", options, default=options)
 
 
-def transform_to_dataframe(data):
+def shop_series(shop):
     """
-    Transform raw query data to a DataFrame.
+    Return {summary column: label} of a shop's metrics plus revenue and profit.
     """
-    return pd.DataFrame(data, columns=["Date", "Metric", "Value"]).pivot(index="Date", columns="Metric", values="Value").reset_index()
+    series = {metric.column: metric.name for metric in shop.metrics}
+    series.update({"revenue": "Revenue", "profit": "Profit"})
+    return series
 
 
-def add_profit_column(df):
+def selected_columns(series, selected_labels):
     """
-    Add profit column to the DataFrame.
+    Narrow {column: label} to the labels the user selected, so only those are fetched.
     """
-    df["Profit"] = df.get("Sales", 0) / 2 - df.get("Salad Cost", 0) - 200
+    return {column: label for column, label in series.items() if label in selected_labels}
 
 
-def plot_chart(df, selected_series):
+def full_resolution_toggle(key):
     """
-    Plot line chart for the selected series.
+    Toggle for charting every day instead of a downsampled series.
+    """
+    return st.toggle("Full resolution", value=False, key=key,
+                     help="Long ranges are charted as weekly or monthly totals unless this is on.")
+
+
+@timed()
+def plot_chart(df, selected_series, full_resolution=False):
+    """
+    Plot line chart for the selected series, downsampled unless `full_resolution`.
     """
     if selected_series:
         chart_data = df[["Date"] + selected_series].set_index("Date")
+        if not full_resolution:
+            chart_data, resolution = downsample(chart_data)
+            if resolution != "Daily":
+                st.caption(f"{resolution} resolution; turn on Full resolution to see every day.")
         st.line_chart(chart_data, use_container_width=True)
     else:
         st.warning("No series selected. Please select at least one series to display.")
 
 
-def display_detailed_data(df):
+DETAILED_DATA_MAX_ROWS = 1000
+
+
+def display_detailed_data(df, export=None, title="Detailed Data"):
+    """
+    Display detailed data table, capped on screen, with download buttons.
+
+    `export` is (sql, params, header, file name) of the query behind `df`;
+    a download re-runs it on request and streams every row, whatever the cap.
     """
-    Display detailed data table.
+    st.write(f"### {title}")
+    if len(df) > DETAILED_DATA_MAX_ROWS:
+        st.caption(f"Showing the first {DETAILED_DATA_MAX_ROWS:,} of {len(df):,} rows; download to get them all.")
+    st.dataframe(df.head(DETAILED_DATA_MAX_ROWS), use_container_width=True)
+    if export is not None:
+        download_buttons(*export)
+
+
+def download_buttons(sql, params, header, file_name):
     """
-    st.write("### Detailed Data")
-    st.dataframe(df, use_container_width=True)
+    Offer the query's rows as a CSV (and, with openpyxl, XLSX) download.
+
+    Each file is built only when its button is clicked: Streamlit calls the
+    deferred `data` callable then. on_click="ignore" skips the rerun, so
+    the report above stays on screen.
+    """
+    formats = export_formats()
+    for column, fmt in zip(st.columns(len(formats)), formats):
+        extension, mime = FORMATS[fmt]
+        with column:
+            st.download_button(
+                f"Download {fmt}",
+                data=functools.partial(export_bytes, sql, params, header, fmt),
+                file_name=f"{file_name}.{extension}",
+                mime=mime,
+                key=f"download_{file_name}_{fmt}",
+                on_click="ignore",
+            )
+
+
+def export_name(*parts):
+    return "_".join(str(part).lower().replace(" ", "_").replace(".", "") for part in parts)
+
+
+def daily_report(shop_name, series, selected_series, start_date, end_date, full_resolution):
+    """
+    Fetch the selected series of a shop for a date range, then chart and list them.
+    """
+    columns = selected_columns(series, selected_series)
+    if not columns:
+        st.warning("No series selected. Please select at least one series to display.")
+        return
+
+    report = Report(shop_name, columns)
+    df = report.fetch(start_date, end_date)
+    if df.empty:
+        st.warning("No data found for the selected date range.")
+        return
+
+    plot_chart(df, list(columns.values()), full_resolution)
+    sql, params = report.query(start_date, end_date)
+    display_detailed_data(df, (sql, params, report.labels, export_name(shop_name, start_date, end_date)))
 
 
 def generate_usage_report():
@@ -56,16 +135,36 @@ def generate_usage_report():
     Main page for generating usage reports for all shops.
     """
     st.subheader("Reports")
-    report_type = st.radio("Select a report type:", ["Barber Shop", "Shoe Shop", "Meatball Shop"], horizontal=True)
+    report_type = st.radio("Select a report type:", [shop.name for shop in SHOPS], horizontal=True)
+
+    # Shops without a dedicated page get the generic daily report
+    custom_reports = {
+        "Barber Shop": barber_shop_reports,
+        "Shoe Shop": shoe_shop_reports,
+        "Meatball Stand": meatball_shop_reports,
+    }
+    if report_type in custom_reports:
+        custom_reports[report_type]()
+    else:
+        shop_daily_report(get_shop(report_type))
+
 
-    if report_type == "Barber Shop":
-        barber_shop_reports()
-    elif report_type == "Shoe Shop":
-        shoe_shop_reports()
-    elif report_type == "Meatball Shop":
-        meatball_shop_reports()
+@timed()
+def shop_daily_report(shop):
+    """
+    Daily metrics, revenue and profit of any shop in the registry.
+    """
+    st.subheader(f"{shop.name} Reports")
+    start_date, end_date = date_range_input("Start Date", "End Date")
+    series = shop_series(shop)
+    selected_series = multiselect_input(list(series.values()))
+    full_resolution = full_resolution_toggle(f"{shop.name}_full_resolution")
 
+    if st.button("Generate Report"):
+        daily_report(shop.name, series, selected_series, start_date, end_date, full_resolution)
 
+
+@timed()
 def barber_shop_reports():
     """
     Generate reports for the Barber Shop with dynamic series selection.
@@ -92,7 +191,8 @@ def barber_shop_reports():
         st.session_state.barber_end_date = end_date
 
     # Multiselect for dynamic series selection
-    available_series = ["Adult Haircuts", "Child Haircuts", "Free Haircuts", "Revenue", "Profit"]
+    series = shop_series(get_shop("Barber Shop"))
+    available_series = list(series.values())
     selected_series = st.multiselect(
         "Select series to display:",
         options=available_series,
@@ -103,41 +203,15 @@ def barber_shop_reports():
     if selected_series != st.session_state.barber_selected_series:
         st.session_state.barber_selected_series = selected_series
 
+    full_resolution = full_resolution_toggle("barber_full_resolution")
+
     # Generate report button
     if st.button("Generate Report"):
-        # Fetch and process data
-        with get_connection() as conn:
-            query = """
-                SELECT date, metric, value
-                FROM daily_entries
-                WHERE shop = 'Barber Shop' AND date BETWEEN ? AND ?
-            """
-            data = conn.execute(query, (st.session_state.barber_start_date, st.session_state.barber_end_date)).fetchall()
-
-        if not data:
-            st.warning("No data found for the selected date range.")
-            return
-
-        # Transform data into a DataFrame
-        df = pd.DataFrame(data, columns=["Date", "Metric", "Value"])
-        df = df.pivot(index="Date", columns="Metric", values="Value").reset_index()
-        df["Revenue"] = (df.get("Adult Haircuts", 0) * 120 + df.get("Child Haircuts", 0) * 100) / 2
-        df["Profit"] = df["Revenue"] - 260
-
-        if st.session_state.barber_selected_series:
-            # Filter DataFrame to include only selected series
-            chart_data = df[["Date"] + st.session_state.barber_selected_series].set_index("Date")
-            st.line_chart(chart_data, use_container_width=True)
-        else:
-            st.warning("No series selected. Please select at least one series to display.")
-
-        # Display detailed data
-        st.write("### Detailed Data")
-        st.dataframe(df, use_container_width=True)
-
-
+        daily_report("Barber Shop", series, st.session_state.barber_selected_series,
+                     st.session_state.barber_start_date, st.session_state.barber_end_date, full_resolution)
 
 
+@timed()
 def shoe_shop_reports():
     """
     Generate reports for the Shoe Shop.
@@ -148,25 +222,10 @@ def shoe_shop_reports():
     # Date range selection
     start_date = st.date_input("Start Date")
     end_date = st.date_input("End Date")
+    full_resolution = full_resolution_toggle("shoe_full_resolution")
 
     if st.button("Generate Report"):
-        with get_connection() as conn:
-            query = """
-                SELECT date, value
-                FROM daily_entries
-                WHERE shop = 'Shoe Shop' AND metric = 'Revenue' AND date BETWEEN ? AND ?
-            """
-            data = conn.execute(query, (start_date, end_date)).fetchall()
-
-        if not data:
-            st.warning("No data found for the selected date range.")
-            return
-
-        # Transform data into a DataFrame
-        df = pd.DataFrame(data, columns=["Date", "Revenue"])
-        st.line_chart(df.set_index("Date"), use_container_width=True)
-        st.write("### Detailed Data")
-        st.dataframe(df, use_container_width=True)
+        daily_report("Shoe Shop", {"shoe_revenue": "Revenue"}, ["Revenue"], start_date, end_date, full_resolution)
 
 
 def meatball_shop_reports():
@@ -188,6 +247,7 @@ def meatball_shop_reports():
         generate_profit_vs_inventory_report()
 
 
+@timed()
 def generate_daily_trends_report():
     """
     Generate daily trends report for the Meatball Shop.
@@ -195,26 +255,14 @@ def generate_daily_trends_report():
     st.info("Select a date range and series to view daily sales and profit trends.")
     start_date, end_date = date_range_input("Start Date", "End Date")
     selected_series = multiselect_input(["Sales", "Salad Cost", "Profit"])
+    full_resolution = full_resolution_toggle("meatball_full_resolution")
 
     if st.button("Generate Daily Report"):
-        with get_connection() as conn:
-            query = """
-                SELECT date, metric, value
-                FROM daily_entries
-                WHERE shop = 'Meatball Stand' AND date BETWEEN ? AND ?
-            """
-            data = conn.execute(query, (start_date, end_date)).fetchall()
-
-        if not data:
-            st.warning("No data found for the selected date range.")
-            return
-
-        df = transform_to_dataframe(data)
-        add_profit_column(df)
-        plot_chart(df, selected_series)
-        display_detailed_data(df)
+        series = {"sales": "Sales", "salad_cost": "Salad Cost", "profit": "Profit"}
+        daily_report("Meatball Stand", series, selected_series, start_date, end_date, full_resolution)
 
 
+@timed()
 def generate_sales_report():
     """
     Generate weekly or monthly sales report for the Meatball Shop.
@@ -223,81 +271,49 @@ def generate_sales_report():
     time_period = st.selectbox("Time Period", ["Weekly", "Monthly"])
 
     if st.button("Generate Sales Report"):
-        with get_connection() as conn:
-            query = """
-                SELECT strftime('%Y-%W', date) AS week, metric, SUM(value) AS total
-                FROM daily_entries
-                WHERE shop = 'Meatball Stand' AND metric = 'Sales'
-                GROUP BY week, metric
-            """ if time_period == "Weekly" else """
-                SELECT strftime('%Y-%m', date) AS month, metric, SUM(value) AS total
-                FROM daily_entries
-                WHERE shop = 'Meatball Stand' AND metric = 'Sales'
-                GROUP BY month, metric
-            """
-            data = conn.execute(query).fetchall()
+        grain = "week" if time_period == "Weekly" else "month"
+        report = Report("Meatball Stand", {"sales": "Total Sales"}, grain=grain)
+        precomputed = get_precomputed("meatball_sales", (grain,))
+        df = report.frame(precomputed.rows) if precomputed is not None else report.fetch()
 
-        if not data:
+        if df.empty:
             st.warning("No data found for the selected time period.")
             return
 
-        df = pd.DataFrame(data, columns=["Period", "Metric", "Total Sales"])
         st.bar_chart(df.set_index("Period")["Total Sales"], use_container_width=True)
-        st.dataframe(df, use_container_width=True)
+        if precomputed is not None:
+            st.caption(f"As of {precomputed.computed_at}")
+        sql, params = report.query()
+        display_detailed_data(df, (sql, params, report.labels, export_name("Meatball Stand", time_period, "sales")),
+                              title="Sales")
 
 
+@timed()
 def generate_profit_vs_inventory_report():
     """
     Compare weekly profit and revenue with inventory cost.
     """
     st.info("Compare weekly profit and revenue with inventory cost.")
     if st.button("Generate Profit vs. Inventory Report"):
+        # Profit, revenue and inventory cost joined per ISO week in SQL
         with get_connection() as conn:
-            # Fetch inventory data
-            query = """
-                SELECT CAST(wi.week_number AS TEXT) AS week, wi.year, SUM(wi.quantity * ii.cost) AS inventory_cost
-                FROM weekly_inventory wi
-                JOIN inventory_items ii ON wi.item_id = ii.id
-                WHERE wi.inventory_type = 'start'
-                GROUP BY wi.week_number, wi.year
-            """
-            inventory_data = conn.execute(query).fetchall()
-
-            # Fetch profit data
-            profit_query = """
-                SELECT strftime('%Y-%W', date) AS week, 
-                       SUM(CASE WHEN metric = 'Sales' THEN value ELSE 0 END) / 2 - 
-                       SUM(CASE WHEN metric = 'Salad Cost' THEN value ELSE 0 END) - 
-                       200 AS profit,
-                       SUM(CASE WHEN metric = 'Sales' THEN value ELSE 0 END) AS revenue
-                FROM daily_entries
-                WHERE shop = 'Meatball Stand'
-                GROUP BY week
-            """
-            profit_data = conn.execute(profit_query).fetchall()
+            data = conn.execute(WEEKLY_PROFIT_VS_INVENTORY, ("Meatball Stand", "Meatball Stand")).fetchall()
 
         # Handle no data case
-        if not inventory_data or not profit_data:
+        if not data:
             st.warning("No data found for the selected time period.")
             return
 
-        # Convert data to DataFrames
-        inventory_df = pd.DataFrame(inventory_data, columns=["Week", "Year", "Inventory Cost"])
-        profit_df = pd.DataFrame(profit_data, columns=["Week", "Profit", "Revenue"])
-
-        # Convert Week columns to string for both DataFrames
-        inventory_df["Week"] = inventory_df["Week"].astype(str)
-        profit_df["Week"] = profit_df["Week"].astype(str)
-
-        # Merge the two DataFrames on Week
-        report_df = pd.merge(inventory_df, profit_df, on="Week", how="outer").fillna(0)
+        report_df = pd.DataFrame([tuple(row) for row in data], columns=["Week", "Profit", "Revenue", "Inventory Cost"])
 
         # Plot the report
         st.line_chart(report_df.set_index("Week")[["Profit", "Revenue", "Inventory Cost"]], use_container_width=True)
 
         # Display detailed report
-        st.write("### Detailed Report")
-        st.dataframe(report_df, use_container_width=True)
+        display_detailed_data(report_df, (
+            WEEKLY_PROFIT_VS_INVENTORY, ("Meatball Stand", "Meatball Stand"), list(report_df.columns),
+            export_name("Meatball Stand", "profit_vs_inventory"),
+        ), title="Detailed Report")
 
 
 
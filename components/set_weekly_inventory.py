@@ -26,8 +26,7 @@ def set_weekly_inventory():
 
             # Save button for each item
             if st.button(f"Save {item['name']} ({inventory_type})"):
-                week_number = inventory_date.isocalendar()[1]
-                year = inventory_date.year
+                year, week_number, _ = inventory_date.isocalendar()
 
                 # Insert or update the inventory record
                 conn.execute("""
@@ -1,4 +1,3 @@
-import sqlite3
 from db.database import get_connection
 
 def fetch_all_tasks():
@@ -6,7 +5,6 @@ def fetch_all_tasks():
     Fetch all tasks from the database and convert them to dictionaries.
     """
     with get_connection() as conn:
-        conn.row_factory = sqlite3.Row  # Ensures rows are accessed as dictionaries
         rows = conn.execute(
             "SELECT id, name, description, deadline, status, parent_task FROM tasks"
         ).fetchall()
@@ -1,8 +1,7 @@
-import sqlite3
 import streamlit as st
 from db.database import get_connection
 from datetime import datetime, date
-import graphviz
+from db.instrumentation import timed
 
 
 def delete_task_with_confirmation(task):
@@ -57,10 +56,13 @@ def task_map_page():
     display_task_list_with_actions(tasks)
 
 
+@timed()
 def display_task_graph(tasks):
     """
     Display tasks and subtasks in a graph form using Graphviz.
     """
+    import graphviz  # imported on first use to keep app start-up light
+
     graph = graphviz.Digraph(format="svg")
     graph.attr(rankdir="LR")  # Arrange the graph from left to right
 
@@ -95,6 +97,7 @@ def delete_task(task_id):
         conn.commit()
 
 
+@timed()
 def display_task_list_with_actions(tasks):
     """
     Display tasks as a list with options to edit, delete, and add subtasks.
@@ -267,7 +270,6 @@ def fetch_all_tasks():
     Fetch all tasks from the database.
     """
     with get_connection() as conn:
-        conn.row_factory = sqlite3.Row
         return conn.execute(
             "SELECT id, name, description, deadline, status, parent_task FROM tasks"
         ).fetchall()
@@ -0,0 +1,113 @@
+import datetime
+import os
+import sqlite3
+
+
+# sqlite3 no longer ships default date adapters (deprecated in Python 3.12),
+# so register the ISO format the app has always stored dates in.
+sqlite3.register_adapter(datetime.date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(" "))
+
+
+class SQLiteCloudBackend:
+    """
+    Remote database hosted on SQLiteCloud.
+    """
+
+    name = "sqlitecloud"
+    is_local = False
+
+    def __init__(self, url):
+        self.url = url
+
+    def connect(self):
+        import sqlitecloud
+
+        conn = sqlitecloud.connect(self.url)
+        # sqlite3.Row only accepts sqlite3 cursors, so use the driver's own Row type.
+        row_factory = getattr(sqlitecloud, "Row", None)
+        if row_factory is not None:
+            conn.row_factory = row_factory
+        return conn
+
+    def describe(self):
+        return self.url.split("?", 1)[0]
+
+
+class LocalSQLiteBackend:
+    """
+    File-backed SQLite database tuned for a read-heavy dashboard.
+
+    WAL lets readers proceed while a save is being written, memory-mapped I/O
+    and a large page cache keep hot report data out of the syscall path, and
+    synchronous=NORMAL is durable across application crashes in WAL mode.
+    """
+
+    name = "sqlite"
+    is_local = True
+
+    def __init__(self, path, mmap_size=256 * 1024 * 1024, cache_size_kib=64 * 1024, busy_timeout_ms=5000):
+        self.path = path
+        self.mmap_size = mmap_size
+        self.cache_size_kib = cache_size_kib
+        self.busy_timeout_ms = busy_timeout_ms
+
+    def connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Pooled connections move between Streamlit session threads; the pool
+        # guarantees only one thread uses a connection at a time.
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=self.busy_timeout_ms / 1000)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kib)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        return conn
+
+    def describe(self):
+        return os.path.abspath(self.path)
+
+
+class ReplicaBackend:
+    """
+    SQLiteCloud primary for writes plus a local SQLite mirror for reads (see db.replica).
+    """
+
+    name = "replica"
+    is_local = True
+
+    def __init__(self, primary, mirror):
+        self.primary = primary
+        self.mirror = mirror
+
+    def connect(self):
+        return self.mirror.connect()
+
+    def describe(self):
+        return f"{self.mirror.describe()} (replica of {self.primary.describe()})"
+
+
+def backend_from_environment(default_url):
+    """
+    Pick the storage backend from the DB_BACKEND environment variable.
+
+    DB_BACKEND=sqlitecloud (default) uses DB_URL or `default_url`;
+    DB_BACKEND=sqlite uses the local file at DB_PATH;
+    DB_BACKEND=replica writes to DB_URL and reads from a mirror at DB_REPLICA_PATH.
+    """
+    kind = os.environ.get("DB_BACKEND", "sqlitecloud").strip().lower()
+    if kind == "sqlitecloud":
+        return SQLiteCloudBackend(os.environ.get("DB_URL", default_url))
+    if kind == "sqlite":
+        return LocalSQLiteBackend(os.environ.get("DB_PATH", os.path.join("data", "business_tracker.db")))
+    if kind == "replica":
+        return ReplicaBackend(
+            SQLiteCloudBackend(os.environ.get("DB_URL", default_url)),
+            LocalSQLiteBackend(os.environ.get("DB_REPLICA_PATH", os.path.join("data", "replica.db"))),
+        )
+    raise ValueError(f"Unknown DB_BACKEND '{kind}'. Expected 'sqlitecloud', 'sqlite' or 'replica'.")
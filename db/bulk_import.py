@@ -0,0 +1,262 @@
+"""
+Bulk import of historical daily entries and weekly inventory counts.
+
+    python -m db.bulk_import daily entries.csv
+    python -m db.bulk_import inventory counts.parquet --chunk-size 10000
+
+Daily entry files have the columns date, shop, metric, value. Inventory
+files have record_date, item, inventory_type ('start'/'end'), quantity.
+Input is streamed (CSV row by row, Parquet batch by batch), validated
+against the known shops, metrics and inventory items, and written in
+chunked `executemany` upserts; a transaction is committed every
+--commit-every chunks. Re-running an import is idempotent.
+"""
+import argparse
+import csv
+import datetime
+import os
+import sys
+import time
+
+from db.database import get_connection, setup_database
+from db.shops import SHOP_METRICS
+from db.write_queries import (
+    UPSERT_DAILY_ENTRY,
+    UPSERT_WEEKLY_INVENTORY,
+    MARK_WEEK_START_COUNTED,
+    MARK_WEEK_END_COUNTED,
+)
+
+DAILY_COLUMNS = ("date", "shop", "metric", "value")
+INVENTORY_COLUMNS = ("record_date", "item", "inventory_type", "quantity")
+
+
+class RowError(ValueError):
+    """
+    A single input row failed validation.
+    """
+
+
+# ----------------------------------------------------------------- readers
+
+def read_rows(path, file_format=None, batch_size=10000):
+    """
+    Stream the rows of a CSV or Parquet file as dicts.
+    """
+    file_format = file_format or os.path.splitext(path)[1].lstrip(".").lower()
+    if file_format == "csv":
+        with open(path, newline="", encoding="utf-8-sig") as source:
+            yield from csv.DictReader(source)
+    elif file_format in ("parquet", "pq"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Reading Parquet files requires pyarrow: pip install pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield from batch.to_pylist()
+    else:
+        raise SystemExit(f"Unsupported input format '{file_format}'. Use csv or parquet.")
+
+
+# -------------------------------------------------------------- validation
+
+def _parse_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(str(value).strip()[:10])
+    except ValueError:
+        raise RowError(f"invalid date '{value}'")
+
+
+def _parse_number(value, name, integer=False):
+    try:
+        number = float(str(value).strip())
+    except ValueError:
+        raise RowError(f"invalid {name} '{value}'")
+    if number < 0:
+        raise RowError(f"negative {name} {number}")
+    if integer:
+        if not number.is_integer():
+            raise RowError(f"{name} must be a whole number, got {value}")
+        return int(number)
+    return number
+
+
+def _require_columns(row, columns):
+    missing = [column for column in columns if column not in row]
+    if missing:
+        raise SystemExit(f"Input is missing column(s): {', '.join(missing)}")
+
+
+def validate_daily_entry(row):
+    """
+    Return (date, shop, metric, value) for a daily entry row or raise RowError.
+    """
+    shop = str(row["shop"]).strip()
+    metric = str(row["metric"]).strip()
+    if shop not in SHOP_METRICS:
+        raise RowError(f"unknown shop '{shop}'")
+    if metric not in SHOP_METRICS[shop]:
+        raise RowError(f"unknown metric '{metric}' for {shop}")
+    return (_parse_date(row["date"]).isoformat(), shop, metric, _parse_number(row["value"], "value", integer=True))
+
+
+def validate_inventory_count(row, item_ids):
+    """
+    Return the weekly_inventory parameters for an inventory row or raise RowError.
+    """
+    record_date = _parse_date(row["record_date"])
+    item = str(row["item"]).strip()
+    inventory_type = str(row["inventory_type"]).strip().lower()
+    if item not in item_ids:
+        raise RowError(f"unknown inventory item '{item}'")
+    if inventory_type not in ("start", "end"):
+        raise RowError(f"inventory_type must be 'start' or 'end', got '{inventory_type}'")
+    expected_day = "Monday" if inventory_type == "start" else "Sunday"
+    if record_date.strftime("%A") != expected_day:
+        raise RowError(f"{inventory_type} inventory must be recorded on a {expected_day}, got {record_date}")
+    # Weeks belong to their ISO year, as in inventory.set_inventory:
+    # 2024-12-30 is week 1 of 2025, not of 2024.
+    year, week_number, _ = record_date.isocalendar()
+    return (
+        item_ids[item], inventory_type, _parse_number(row["quantity"], "quantity"),
+        record_date.isoformat(), week_number, year,
+    )
+
+
+# ----------------------------------------------------------------- loading
+
+class Progress:
+    """
+    Periodic progress line on stderr and the final rows-per-second summary.
+    """
+
+    def __init__(self, label, interval=2.0):
+        self.label = label
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.last_report = self.started
+        self.read = 0
+        self.written = 0
+        self.rejected = 0
+
+    def tick(self, force=False):
+        now = time.perf_counter()
+        if force or now - self.last_report >= self.interval:
+            self.last_report = now
+            print(f"\r{self.label}: {self.read:,} read, {self.written:,} written, {self.rejected:,} rejected "
+                  f"({self.rate():,.0f} rows/s)", end="", file=sys.stderr, flush=True)
+
+    def rate(self):
+        elapsed = time.perf_counter() - self.started
+        return self.written / elapsed if elapsed > 0 else 0.0
+
+
+def load(rows, columns, validate, write_chunk, label, chunk_size=5000, commit_every=20,
+         max_errors=1000, reject_path=None, dry_run=False):
+    """
+    Validate and write `rows` in chunks; return the Progress counters.
+    """
+    progress = Progress(label)
+    rejects = open(reject_path, "w", newline="", encoding="utf-8") if reject_path else None
+    reject_writer = csv.writer(rejects) if rejects else None
+    if reject_writer:
+        reject_writer.writerow(list(columns) + ["error"])
+
+    chunk = []
+    chunks_in_transaction = 0
+    try:
+        with get_connection() as conn:
+            for line_number, row in enumerate(rows, start=2):
+                if progress.read == 0:
+                    _require_columns(row, columns)
+                progress.read += 1
+                try:
+                    chunk.append(validate(row))
+                except RowError as e:
+                    progress.rejected += 1
+                    if reject_writer:
+                        reject_writer.writerow([row.get(column) for column in columns] + [str(e)])
+                    elif progress.rejected <= 10:
+                        print(f"\nrow {line_number}: {e}", file=sys.stderr)
+                    if progress.rejected > max_errors:
+                        raise SystemExit(f"\nAborting: more than {max_errors} invalid rows.")
+                    continue
+
+                if len(chunk) >= chunk_size:
+                    if not dry_run:
+                        write_chunk(conn, chunk)
+                        chunks_in_transaction += 1
+                        if chunks_in_transaction >= commit_every:
+                            conn.commit()
+                            chunks_in_transaction = 0
+                    progress.written += len(chunk)
+                    chunk = []
+                    progress.tick()
+
+            if chunk:
+                if not dry_run:
+                    write_chunk(conn, chunk)
+                progress.written += len(chunk)
+            if not dry_run:
+                conn.commit()
+    finally:
+        if rejects:
+            rejects.close()
+
+    progress.tick(force=True)
+    print(file=sys.stderr)
+    return progress
+
+
+def write_daily_entries(conn, chunk):
+    conn.executemany(UPSERT_DAILY_ENTRY, chunk)
+
+
+def write_inventory_counts(conn, chunk):
+    conn.executemany(UPSERT_WEEKLY_INVENTORY, chunk)
+    starts = {(row[4], row[5]) for row in chunk if row[1] == "start"}
+    ends = {(row[4], row[5]) for row in chunk if row[1] == "end"}
+    if starts:
+        conn.executemany(MARK_WEEK_START_COUNTED, sorted(starts))
+    if ends:
+        conn.executemany(MARK_WEEK_END_COUNTED, sorted(ends))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m db.bulk_import", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("kind", choices=["daily", "inventory"], help="what the file contains")
+    parser.add_argument("path", help="CSV or Parquet file")
+    parser.add_argument("--format", choices=["csv", "parquet"], help="input format (default: from the file extension)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per executemany (default 5000)")
+    parser.add_argument("--commit-every", type=int, default=20, help="chunks per transaction (default 20)")
+    parser.add_argument("--max-errors", type=int, default=1000, help="abort after this many invalid rows")
+    parser.add_argument("--reject-file", help="write invalid rows and their errors to this CSV")
+    parser.add_argument("--dry-run", action="store_true", help="validate only, write nothing")
+    args = parser.parse_args(argv)
+
+    setup_database()
+    rows = read_rows(args.path, args.format, batch_size=args.chunk_size)
+    options = dict(chunk_size=args.chunk_size, commit_every=args.commit_every, max_errors=args.max_errors,
+                   reject_path=args.reject_file, dry_run=args.dry_run)
+
+    if args.kind == "daily":
+        progress = load(rows, DAILY_COLUMNS, validate_daily_entry, write_daily_entries, "daily entries", **options)
+    else:
+        with get_connection() as conn:
+            item_ids = {item["name"]: item["id"] for item in conn.execute("SELECT id, name FROM inventory_items").fetchall()}
+        progress = load(rows, INVENTORY_COLUMNS, lambda row: validate_inventory_count(row, item_ids),
+                        write_inventory_counts, "inventory counts", **options)
+
+    elapsed = time.perf_counter() - progress.started
+    action = "validated" if args.dry_run else "imported"
+    print(f"{progress.written:,} rows {action}, {progress.rejected:,} rejected in {elapsed:.1f}s "
+          f"({progress.rate():,.0f} rows/s)")
+    return 1 if progress.rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Precomputed `calendar` dimension: one row per day with integer keys.
+
+Weekly and monthly reports join dates through this table instead of
+formatting them with strftime(), so every side of a join agrees on ISO
+week numbering (`date.isocalendar()`, as the inventory pages use) and
+joins on indexed integers:
+
+- date_key       YYYYMMDD
+- iso_week_key   ISO year * 100 + ISO week (2025-W01 is 202501)
+- month_key      year * 100 + month
+
+The table covers CALENDAR_FIRST_YEAR to CALENDAR_LAST_YEAR; `create_calendar`
+fills in any days that are missing, so widening the range is a one-line change.
+"""
+import datetime
+
+CALENDAR_FIRST_YEAR = 1970
+CALENDAR_LAST_YEAR = 2100
+
+CALENDAR_COLUMNS = [
+    "date_key", "date", "year", "iso_year", "iso_week", "iso_week_key",
+    "month", "month_key", "quarter", "weekday", "is_business_day",
+]
+
+
+def calendar_rows(first_year=CALENDAR_FIRST_YEAR, last_year=CALENDAR_LAST_YEAR):
+    """
+    Yield one calendar row (in CALENDAR_COLUMNS order) per day of the given years.
+    """
+    day = datetime.date(first_year, 1, 1)
+    last = datetime.date(last_year, 12, 31)
+    one_day = datetime.timedelta(days=1)
+    while day <= last:
+        iso_year, iso_week, weekday = day.isocalendar()
+        yield (
+            day.year * 10000 + day.month * 100 + day.day,
+            day.isoformat(),
+            day.year,
+            iso_year,
+            iso_week,
+            iso_year * 100 + iso_week,
+            day.month,
+            day.year * 100 + day.month,
+            (day.month - 1) // 3 + 1,
+            weekday,  # 1 = Monday ... 7 = Sunday
+            int(weekday <= 5),
+        )
+        day += one_day
+
+
+def create_calendar(conn, first_year=CALENDAR_FIRST_YEAR, last_year=CALENDAR_LAST_YEAR):
+    """
+    Create the calendar table and its indexes and fill in the given years. The caller commits.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS calendar (
+            date_key INTEGER PRIMARY KEY,
+            date TEXT NOT NULL UNIQUE,
+            year INTEGER NOT NULL,
+            iso_year INTEGER NOT NULL,
+            iso_week INTEGER NOT NULL,
+            iso_week_key INTEGER NOT NULL,
+            month INTEGER NOT NULL,
+            month_key INTEGER NOT NULL,
+            quarter INTEGER NOT NULL,
+            weekday INTEGER NOT NULL,
+            is_business_day INTEGER NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_calendar_iso_week ON calendar (iso_week_key, date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_calendar_month ON calendar (month_key, date)")
+
+    expected = (datetime.date(last_year, 12, 31) - datetime.date(first_year, 1, 1)).days + 1
+    present = conn.execute(
+        "SELECT COUNT(*) FROM calendar WHERE year BETWEEN ? AND ?", (first_year, last_year), use_cache=False
+    ).fetchone()[0]
+    if present == expected:
+        return
+    conn.executemany(
+        f"INSERT OR IGNORE INTO calendar ({', '.join(CALENDAR_COLUMNS)}) "
+        f"VALUES ({', '.join('?' for _ in CALENDAR_COLUMNS)})",
+        list(calendar_rows(first_year, last_year)),
+    )
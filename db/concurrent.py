@@ -0,0 +1,77 @@
+"""
+Run independent read queries in parallel on pooled connections.
+
+Pages that need several unrelated result sets (one per shop, start and end
+inventory, ...) pay one network round-trip of wall-clock time instead of
+one per query.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from db.database import get_connection, POOL_MAX_SIZE
+from db.instrumentation import capture_context, use_context
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class ConcurrentQueryError(Exception):
+    """
+    One or more queries of a `run_queries` batch failed.
+
+    `errors` maps each failed query name to its exception and `results`
+    holds the rows of the queries that succeeded.
+    """
+
+    def __init__(self, errors, results):
+        self.errors = errors
+        self.results = results
+        details = "; ".join(f"{name}: {error}" for name, error in errors.items())
+        super().__init__(f"{len(errors)} of {len(errors) + len(results)} queries failed ({details})")
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # Leave one pool slot for the calling thread, which may already hold a connection.
+                _executor = ThreadPoolExecutor(max_workers=max(1, POOL_MAX_SIZE - 1), thread_name_prefix="db-query")
+    return _executor
+
+
+def _fetch(sql, params, context):
+    with use_context(context):
+        with get_connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+
+def run_queries(queries):
+    """
+    Execute {name: (sql, params)} concurrently and return {name: rows}.
+
+    All queries run to completion; if any failed, ConcurrentQueryError is
+    raised (chained to the first failure) carrying every error and the
+    successful results.
+    """
+    if len(queries) == 1:
+        (name, (sql, params)), = queries.items()
+        with get_connection() as conn:
+            return {name: conn.execute(sql, params).fetchall()}
+
+    context = capture_context()
+    futures = {
+        name: _get_executor().submit(_fetch, sql, params, context)
+        for name, (sql, params) in queries.items()
+    }
+
+    results, errors = {}, {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            errors[name] = e
+
+    if errors:
+        raise ConcurrentQueryError(errors, results) from next(iter(errors.values()))
+    return results
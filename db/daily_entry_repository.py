@@ -0,0 +1,133 @@
+"""
+Single write path for daily entries.
+
+`DailyEntryRepository.bulk_upsert` writes any number of (date, shop,
+metric, value) rows in one transaction and reports how many were
+inserted, updated or already up to date. Both the multi-day grid and the
+single-day entry forms save through it via `save_daily_entries`, which
+journals the rows only when the database cannot be reached; the journal
+replays the same guarded upsert in the background.
+"""
+import datetime
+
+from db.database import get_connection
+from db.write_queries import UPSERT_DAILY_ENTRY
+
+# Rows per lookup query; 3 parameters each keeps well under SQLite's variable limit.
+LOOKUP_CHUNK_SIZE = 250
+
+
+def _entry_key(entry):
+    date, shop, metric, value = entry
+    if isinstance(date, (datetime.date, datetime.datetime)):
+        date = date.isoformat()[:10]
+    return (str(date), shop, metric), value
+
+
+class DailyEntryRepository:
+    """
+    Reads and writes rows of `daily_entries`.
+    """
+
+    def __init__(self, connection_factory=get_connection):
+        self._connection_factory = connection_factory
+
+    def existing_values(self, conn, keys):
+        """
+        Return {(date, shop, metric): value} for the keys that already have a row.
+        """
+        existing = {}
+        for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+            placeholders = ", ".join("(?, ?, ?)" for _ in chunk)
+            rows = conn.execute(
+                f"SELECT date, shop, metric, value FROM daily_entries "
+                f"WHERE (date, shop, metric) IN (VALUES {placeholders})",
+                [part for key in chunk for part in key],
+                use_cache=False,
+            ).fetchall()
+            existing.update({(row[0], row[1], row[2]): row[3] for row in rows})
+        return existing
+
+    def bulk_upsert(self, entries):
+        """
+        Write (date, shop, metric, value) rows in one transaction.
+
+        Later duplicates of the same (date, shop, metric) win. Rows whose value
+        is already stored are not written. Returns a dict with the counts of
+        "inserted", "updated" and "unchanged" rows.
+        """
+        wanted = {}
+        for entry in entries:
+            key, value = _entry_key(entry)
+            wanted[key] = value
+
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        if not wanted:
+            return counts
+
+        with self._connection_factory() as conn:
+            # Open the write transaction before looking up: the lookup then reads
+            # the primary (not a replica mirror, which may be stale) under the
+            # write lock, so no other writer can change a row in between.
+            conn.execute("BEGIN IMMEDIATE")
+            existing = self.existing_values(conn, list(wanted))
+            rows = []
+            for key, value in wanted.items():
+                if key not in existing:
+                    counts["inserted"] += 1
+                elif existing[key] == value:
+                    counts["unchanged"] += 1
+                    continue
+                else:
+                    counts["updated"] += 1
+                rows.append(key + (value,))
+            if rows:
+                conn.executemany(UPSERT_DAILY_ENTRY, rows)
+            conn.commit()
+        return counts
+
+
+def _database_reachable():
+    try:
+        with get_connection() as conn:
+            return conn.ping()
+    except Exception:
+        return False
+
+
+def _journal_daily_entries(entries):
+    """
+    Journal entries to be upserted in the background; confirms as soon as they are on disk.
+    """
+    from db.write_journal import journal_write
+
+    rows = [key + (value,) for key, value in map(_entry_key, entries)]
+    return journal_write([(UPSERT_DAILY_ENTRY, rows)])
+
+
+def save_daily_entries(entries):
+    """
+    Save entries through the repository, falling back to the write journal.
+
+    Returns the `bulk_upsert` counts, or None when the database could not be
+    reached and the entries were journaled to be written in the background.
+    Any other error (e.g. one the database raises for these rows) is re-raised.
+    """
+    entries = list(entries)
+    try:
+        return DailyEntryRepository().bulk_upsert(entries)
+    except Exception:
+        if _database_reachable():
+            raise
+        _journal_daily_entries(entries)
+        return None
+
+
+def saved_message(counts):
+    """
+    Describe a `save_daily_entries` result for the forms.
+    """
+    if counts is None:
+        return "The database is unreachable; the entry is stored locally and will sync automatically."
+    return f"({counts['inserted']} new, {counts['updated']} updated, {counts['unchanged']} unchanged)"
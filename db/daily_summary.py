@@ -0,0 +1,235 @@
+"""
+One pre-pivoted row per shop per day, kept in step with `daily_entries`.
+
+`daily_shop_summary` holds every metric of a shop-day as its own column
+plus the day's revenue, cost and profit, using the profit engine's
+formulas for the shop registry. Triggers on `daily_entries` recompute the
+affected shop-days on every insert, update and delete, whichever path the
+write came from (forms, journal, bulk import, replica sync).
+
+`weekly_shop_rollup` and `monthly_shop_rollup` hold the same columns
+summed per shop and ISO week or month, keyed by the `calendar` table's
+integer `iso_week_key` / `month_key` (see db.calendar_table). Triggers on
+`daily_shop_summary` add and subtract each shop-day as it changes, so
+period reports read a few rows however long the history is.
+
+`setup_database` rebuilds all three when the registry changes; to rebuild
+them by hand, or the daily rows only for some dates, run:
+
+    python -m db.daily_summary [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+"""
+import argparse
+
+from db.calendar_table import create_calendar
+from db.migrations import add_column
+from db.profit_sql import profit_sql, quote_literal
+from db.shops import METRIC_COLUMNS, SHOPS
+
+VALUE_COLUMNS = [*METRIC_COLUMNS, "revenue", "cost", "profit"]
+SUMMARY_COLUMNS = ["date", "shop", *VALUE_COLUMNS]
+
+# Rollup table -> calendar column holding its period key
+ROLLUPS = {
+    "weekly_shop_rollup": "iso_week_key",
+    "monthly_shop_rollup": "month_key",
+}
+
+
+def summary_select(where):
+    """
+    Return a SELECT producing daily_shop_summary rows for the daily_entries matching `where`.
+    """
+    metrics = ",\n".join(
+        f"SUM(CASE WHEN shop = {quote_literal(shop.name)} AND metric = {quote_literal(metric.name)} THEN value ELSE 0 END) "
+        f"AS {metric.column}"
+        for shop in SHOPS for metric in shop.metrics
+    )
+    formulas = profit_sql()
+    return f"""
+        SELECT date, shop, {", ".join(METRIC_COLUMNS)},
+            {formulas["revenue"]} AS revenue,
+            {formulas["cost"]} AS cost,
+            {formulas["profit"]} AS profit
+        FROM (
+            SELECT date, shop,
+            {metrics}
+            FROM daily_entries
+            WHERE {where}
+            GROUP BY shop, date
+        )
+    """
+
+
+def _refresh(key):
+    """
+    Trigger statements recomputing the shop-day of the OLD or NEW row.
+    """
+    return f"""
+        DELETE FROM daily_shop_summary WHERE shop = {key}.shop AND date = {key}.date;
+        INSERT INTO daily_shop_summary ({", ".join(SUMMARY_COLUMNS)})
+        {summary_select(f"shop = {key}.shop AND date = {key}.date")};
+    """
+
+
+def _rollup_add(row):
+    """
+    Trigger statements adding the NEW (or subtracting the OLD) shop-day to every rollup.
+    """
+    statements = []
+    for table, calendar_column in ROLLUPS.items():
+        key = f"(SELECT {calendar_column} FROM calendar WHERE date = {row}.date)"
+        if row == "NEW":
+            statements.append(f"""
+                INSERT INTO {table} (shop, period, days, {", ".join(VALUE_COLUMNS)})
+                VALUES (NEW.shop, {key}, 1, {", ".join(f"NEW.{column}" for column in VALUE_COLUMNS)})
+                ON CONFLICT (shop, period) DO UPDATE SET
+                    days = days + 1, {", ".join(f"{column} = {column} + excluded.{column}" for column in VALUE_COLUMNS)};
+            """)
+        else:
+            statements.append(f"""
+                UPDATE {table} SET
+                    days = days - 1, {", ".join(f"{column} = {column} - OLD.{column}" for column in VALUE_COLUMNS)}
+                WHERE shop = OLD.shop AND period = {key};
+                DELETE FROM {table} WHERE shop = OLD.shop AND period = {key} AND days <= 0;
+            """)
+    return "".join(statements)
+
+
+def _trigger_sql():
+    """
+    Return {trigger name: CREATE TRIGGER statement} for the current shop registry.
+    """
+    return {
+        "trg_daily_shop_summary_rollup_insert": f"""CREATE TRIGGER trg_daily_shop_summary_rollup_insert
+        AFTER INSERT ON daily_shop_summary
+        BEGIN {_rollup_add("NEW")} END""",
+        "trg_daily_shop_summary_rollup_update": f"""CREATE TRIGGER trg_daily_shop_summary_rollup_update
+        AFTER UPDATE ON daily_shop_summary
+        BEGIN {_rollup_add("OLD")} {_rollup_add("NEW")} END""",
+        "trg_daily_shop_summary_rollup_delete": f"""CREATE TRIGGER trg_daily_shop_summary_rollup_delete
+        AFTER DELETE ON daily_shop_summary
+        BEGIN {_rollup_add("OLD")} END""",
+        "trg_daily_entries_summary_insert": f"""CREATE TRIGGER trg_daily_entries_summary_insert
+        AFTER INSERT ON daily_entries
+        BEGIN {_refresh("NEW")} END""",
+        "trg_daily_entries_summary_update": f"""CREATE TRIGGER trg_daily_entries_summary_update
+        AFTER UPDATE OF date, shop, metric, value ON daily_entries
+        BEGIN {_refresh("OLD")} {_refresh("NEW")} END""",
+        "trg_daily_entries_summary_delete": f"""CREATE TRIGGER trg_daily_entries_summary_delete
+        AFTER DELETE ON daily_entries
+        BEGIN {_refresh("OLD")} END""",
+    }
+
+
+def install_triggers(conn):
+    """
+    (Re)create the triggers that maintain daily_shop_summary and its rollups,
+    creating the calendar and rollup tables and adding columns for new metrics.
+    """
+    create_calendar(conn)
+    for table in ROLLUPS:
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                shop TEXT NOT NULL,
+                period INTEGER NOT NULL,
+                days INTEGER NOT NULL DEFAULT 0,
+                revenue INTEGER NOT NULL DEFAULT 0,
+                cost INTEGER NOT NULL DEFAULT 0,
+                profit INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (shop, period)
+            ) WITHOUT ROWID
+        """)
+    for table in ["daily_shop_summary", *ROLLUPS]:
+        for column in METRIC_COLUMNS:
+            add_column(conn, table, column, "INTEGER NOT NULL DEFAULT 0")
+    for name, sql in _trigger_sql().items():
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        conn.execute(sql)
+
+
+def is_current(conn):
+    """
+    Return True if the installed triggers match the current shop registry.
+    """
+    installed = dict(conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' "
+        "AND (name LIKE 'trg_daily_entries_summary_%' OR name LIKE 'trg_daily_shop_summary_rollup_%')"
+    ).fetchall())
+    return installed == _trigger_sql()
+
+
+def ensure_current(conn):
+    """
+    Rebuild daily_shop_summary and its rollups if shops, metrics or prices
+    changed since they were built, or if a migration dropped their triggers.
+
+    Migrations only create the registry-independent schema; this adds the
+    metric columns, triggers and contents, and runs right after them.
+    Returns True if they had to be rebuilt.
+    """
+    if is_current(conn):
+        return False
+    install_triggers(conn)
+    backfill(conn)
+    rebuild_rollups(conn)
+    conn.commit()
+    return True
+
+
+def backfill(conn, start_date=None, end_date=None):
+    """
+    Rebuild daily_shop_summary from daily_entries, optionally only between two dates.
+
+    The rollup triggers carry the change into the weekly and monthly tables.
+    Returns the number of summary rows written. The caller commits.
+    """
+    conditions, params = ["1 = 1"], []
+    if start_date is not None:
+        conditions.append("date >= ?")
+        params.append(str(start_date))
+    if end_date is not None:
+        conditions.append("date <= ?")
+        params.append(str(end_date))
+    where = " AND ".join(conditions)
+    conn.execute(f"DELETE FROM daily_shop_summary WHERE {where}", params)
+    conn.execute(f"INSERT INTO daily_shop_summary ({', '.join(SUMMARY_COLUMNS)}) {summary_select(where)}", params)
+    return conn.execute(f"SELECT COUNT(*) FROM daily_shop_summary WHERE {where}", params, use_cache=False).fetchone()[0]
+
+
+def rebuild_rollups(conn):
+    """
+    Recompute every weekly and monthly rollup from daily_shop_summary. The caller commits.
+    """
+    sums = ", ".join(f"SUM(s.{column})" for column in VALUE_COLUMNS)
+    for table, calendar_column in ROLLUPS.items():
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(f"""
+            INSERT INTO {table} (shop, period, days, {", ".join(VALUE_COLUMNS)})
+            SELECT s.shop, c.{calendar_column}, COUNT(*), {sums}
+            FROM daily_shop_summary s
+            JOIN calendar c ON c.date = s.date
+            GROUP BY s.shop, c.{calendar_column}
+        """)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m db.daily_summary",
+                                     description="Rebuild daily_shop_summary and its rollups from daily_entries.")
+    parser.add_argument("--from", dest="start_date", help="first date to rebuild (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end_date", help="last date to rebuild (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    from db.database import get_connection, setup_database
+
+    setup_database()
+    with get_connection() as conn:
+        install_triggers(conn)
+        rows = backfill(conn, args.start_date, args.end_date)
+        if args.start_date is None and args.end_date is None:
+            rebuild_rollups(conn)
+        conn.commit()
+    print(f"daily_shop_summary: {rows} rows rebuilt")
+
+
+if __name__ == "__main__":
+    main()
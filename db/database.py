@@ -1,113 +1,202 @@
 import sqlite3
 import os
-import requests
-import sqlitecloud
+import logging
+import threading
+from db.backends import backend_from_environment
+from db.daily_summary import ensure_current as ensure_summary_current
+from db.migrations import migrate
+from db.pool import ConnectionPool
+from db.query_cache import QueryCache
+from db.replica import Replica, ReplicaConnection
+
+logger = logging.getLogger(__name__)
 
 # Connection details
 SQLITECLOUD_URL = "sqlitecloud://cw3hlt0nnz.sqlite.cloud:8860/business_tracker.db?apikey=WcLJyCl3vRVS7mZaXIM6jXJSvKgAYBCvqfRItH6kmZA"
 
+# Pool settings (overridable from the environment)
+POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", "5"))
+POOL_CHECKOUT_TIMEOUT = float(os.environ.get("DB_POOL_CHECKOUT_TIMEOUT", "30"))
+POOL_MAX_IDLE_TIME = float(os.environ.get("DB_POOL_MAX_IDLE_TIME", "300"))
+
+# Query result cache settings; DB_QUERY_CACHE_MAX_ENTRIES=0 disables it
+QUERY_CACHE_MAX_ENTRIES = int(os.environ.get("DB_QUERY_CACHE_MAX_ENTRIES", "512"))
+QUERY_CACHE_TTL = float(os.environ.get("DB_QUERY_CACHE_TTL", "300"))
+
+# How often the local replica pulls changes from the primary (DB_BACKEND=replica)
+REPLICA_SYNC_INTERVAL = float(os.environ.get("DB_REPLICA_SYNC_INTERVAL", "30"))
+
+_backend = None
+_pool = None
+_replica = None
+_pool_lock = threading.Lock()
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def get_backend():
+    """
+    Return the storage backend selected by DB_BACKEND (SQLiteCloud by default).
+    """
+    global _backend
+    if _backend is None:
+        with _pool_lock:
+            if _backend is None:
+                _backend = backend_from_environment(SQLITECLOUD_URL)
+    return _backend
+
+
+def get_pool():
+    """
+    Return the process-wide connection pool, creating it on first use.
+    """
+    global _pool
+    backend = get_backend()
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                cache = None
+                if QUERY_CACHE_MAX_ENTRIES > 0:
+                    cache = QueryCache(QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_TTL)
+                    # Trigger-maintained tables change whenever their source does.
+                    cache.add_derived("daily_entries", "daily_shop_summary")
+                    cache.add_derived("daily_shop_summary", "weekly_shop_rollup", "monthly_shop_rollup")
+                _pool = ConnectionPool(
+                    backend.connect,
+                    max_size=POOL_MAX_SIZE,
+                    checkout_timeout=POOL_CHECKOUT_TIMEOUT,
+                    max_idle_time=POOL_MAX_IDLE_TIME,
+                    cache=cache,
+                )
+    return _pool
+
+
+def get_replica():
+    """
+    Return the local read replica when DB_BACKEND=replica, otherwise None.
+    """
+    global _replica
+    backend = get_backend()
+    if backend.name != "replica":
+        return None
+    local_pool = get_pool()
+    if _replica is None:
+        with _pool_lock:
+            if _replica is None:
+                # The primary only sees writes and read-your-writes reads, so it
+                # needs no result cache; cached reads all come from the mirror.
+                primary_pool = ConnectionPool(
+                    backend.primary.connect,
+                    max_size=POOL_MAX_SIZE,
+                    checkout_timeout=POOL_CHECKOUT_TIMEOUT,
+                    max_idle_time=POOL_MAX_IDLE_TIME,
+                )
+                _replica = Replica(local_pool, primary_pool, sync_interval=REPLICA_SYNC_INTERVAL)
+    return _replica
+
 
 def get_connection():
     """
-    Establish a connection to the SQLiteCloud database.
+    Check out a connection to the configured database from the shared pool.
+
+    Use it as a context manager; the connection goes back to the pool on exit.
+    In replica mode reads are served by the local mirror and writes go to the primary.
+    """
+    replica = get_replica()
+    if replica is not None:
+        return ReplicaConnection(replica)
+    return get_pool().connection()
+
+
+def get_pool_stats():
+    """
+    Return hit/miss and wait-time statistics for the connection pool.
     """
-    conn = sqlitecloud.connect(SQLITECLOUD_URL)
-    return conn
+    return get_pool().stats()
+
+
+def get_query_cache():
+    """
+    Return the shared query result cache, or None when it is disabled.
+    """
+    return get_pool().cache
+
+
+def get_cache_stats():
+    """
+    Return hit/miss statistics for the query result cache.
+    """
+    cache = get_query_cache()
+    return cache.stats() if cache is not None else {}
+
 
-    
 def setup_database():
     """
-    Create necessary tables if they do not exist.
+    Bring the schema up to date by applying pending migrations.
+
+    Streamlit calls this on every rerun, so the work happens at most once
+    per process; later calls return without touching the database.
     """
-    with get_connection() as conn:
-        # Create table for daily entries
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS daily_entries (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                shop TEXT NOT NULL,
-                metric TEXT NOT NULL,
-                value INTEGER NOT NULL,
-                UNIQUE(date, shop, metric)
-            )
-        """)
-
-        # Create table for inventory items
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS inventory_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                cost INTEGER NOT NULL,
-                quantity REAL DEFAULT 0 NOT NULL,
-                UNIQUE(name)
-            )
-        """)
-
-        # Create table for weekly inventory records
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS weekly_inventory (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                item_id INTEGER NOT NULL,
-                inventory_type TEXT NOT NULL CHECK (inventory_type IN ('start', 'end')),
-                quantity REAL NOT NULL,
-                record_date TEXT NOT NULL,
-                week_number INTEGER NOT NULL,
-                year INTEGER NOT NULL,
-                FOREIGN KEY (item_id) REFERENCES inventory_items (id),
-                UNIQUE(item_id, inventory_type, week_number, year)
-            )
-        """)
-
-        # Create table for weekly tracking completeness
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS weekly_tracking (
-                week_number INTEGER NOT NULL,
-                year INTEGER NOT NULL,
-                start_inventory BOOLEAN NOT NULL DEFAULT 0,
-                end_inventory BOOLEAN NOT NULL DEFAULT 0,
-                UNIQUE(week_number, year)
-            )
-        """)
-
-        # Create table for tasks
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                description TEXT NOT NULL,
-                deadline TEXT NOT NULL,
-                status TEXT NOT NULL DEFAULT 'Pending',
-                parent_task INTEGER DEFAULT NULL,
-                FOREIGN KEY (parent_task) REFERENCES tasks (id)
-            )
-        """)
-
-        # Create table for accounts
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS accounts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                balance INTEGER NOT NULL,
-                goal INTEGER NOT NULL,
-                UNIQUE(name)
-            )
-        """)
-
-        conn.commit()
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        replica = get_replica()
+        if replica is None:
+            with get_connection() as conn:
+                migrate(conn)
+                ensure_summary_current(conn)
+        else:
+            with replica.primary_pool.connection() as conn:
+                migrate(conn)
+                ensure_summary_current(conn)
+            replica.prepare_mirror()
+            try:
+                replica.sync()
+            except Exception as e:
+                # Serve whatever the mirror already holds; the sync thread keeps retrying.
+                logger.warning("Initial replica sync failed: %s", e)
+            replica.start()
+        _schema_ready = True
+
+
+def get_replica_status():
+    """
+    Return replica lag and last-sync details, or None when not in replica mode.
+    """
+    replica = get_replica()
+    return replica.status() if replica is not None else None
+
+
+def force_replica_refresh():
+    """
+    Pull all pending changes into the local replica now; a no-op outside replica mode.
+    """
+    replica = get_replica()
+    return replica.force_refresh() if replica is not None else None
+
 
 def reset_database():
     """
     Reset the database by dropping all tables and recreating them.
     Use this function to start fresh.
     """
-    with get_connection() as conn:
-        conn.execute("DROP TABLE IF EXISTS daily_entries;")
-        conn.execute("DROP TABLE IF EXISTS inventory_items;")
-        conn.execute("DROP TABLE IF EXISTS weekly_inventory;")
-        conn.execute("DROP TABLE IF EXISTS weekly_tracking;")
-        conn.execute("DROP TABLE IF EXISTS tasks;")
-        conn.execute("DROP TABLE IF EXISTS accounts;")
-        conn.commit()
+    global _schema_ready
+    replica = get_replica()
+    # In replica mode the mirror is dropped too, so it is rebuilt from scratch.
+    pools = [get_pool()] if replica is None else [replica.primary_pool, replica.local_pool]
+    with _schema_lock:
+        for pool in pools:
+            with pool.connection() as conn:
+                tables = conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+                ).fetchall()
+                for table in tables:
+                    conn.execute(f"DROP TABLE IF EXISTS {table[0]};")
+                conn.commit()
+        _schema_ready = False
     setup_database()
 
 
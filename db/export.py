@@ -0,0 +1,275 @@
+"""
+Columnar snapshot export of the database to partitioned Parquet files.
+
+    python -m db.export snapshots/            # full snapshot
+    python -m db.export snapshots/ --incremental
+
+Every table is read in keyset-paginated chunks (never with OFFSET, never
+all at once) and written as Parquet row groups. daily_entries is
+partitioned by year/month of `date`, weekly_inventory by `iso_year` (its
+`year` column; a differently named directory keeps pyarrow's hive
+partitioning from clashing with the column when the directory is read).
+
+An incremental run appends only rows whose `change_seq` is above the
+watermark stored in `_export_state.json` by the previous run. Each file
+carries `_rowid` and `change_seq`, so readers keep the row with the
+highest `change_seq` per `_rowid` to get the current state. Rows deleted
+since the previous run (the `row_deletions` log, migration 4) are written
+to `_deletions/table=<table>/` with their `_rowid` and `change_seq`;
+readers drop a row whose latest change is a deletion. Requires pyarrow.
+
+The whole export reads one snapshot (a single read transaction), and the
+watermark is the change counter read at its start, so a row changed while
+the export runs is picked up by the next incremental run.
+"""
+import argparse
+import datetime
+import json
+import os
+import shutil
+import sys
+import time
+from collections import OrderedDict
+
+from db.database import get_connection, setup_database
+
+EXPORT_TABLES = ("daily_entries", "inventory_items", "weekly_inventory", "weekly_tracking", "tasks", "accounts")
+STATE_FILE = "_export_state.json"
+DELETIONS_DIR = "_deletions"
+
+
+def _partition_daily_entries(row):
+    return f"year={row['date'][:4]}/month={row['date'][5:7]}"
+
+
+def _partition_weekly_inventory(row):
+    return f"iso_year={row['year']}"
+
+
+PARTITIONERS = {
+    "daily_entries": _partition_daily_entries,
+    "weekly_inventory": _partition_weekly_inventory,
+}
+
+
+def _arrow_schema(conn, table):
+    """
+    Build a stable Arrow schema from the declared column types.
+    """
+    import pyarrow as pa
+
+    fields = [pa.field("_rowid", pa.int64(), nullable=False)]
+    for column in conn.execute(f"PRAGMA table_info({table})", use_cache=False).fetchall():
+        declared = (column[2] or "").upper()
+        if "INT" in declared or "BOOL" in declared:
+            arrow_type = pa.int64()
+        elif any(kind in declared for kind in ("REAL", "FLOA", "DOUB")):
+            arrow_type = pa.float64()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column[1], arrow_type))
+    return pa.schema(fields)
+
+
+def iter_chunks(conn, table, chunk_size, since_seq=None):
+    """
+    Yield lists of row dicts from `table`, paginated on (change_seq, rowid) or rowid.
+    """
+    if since_seq is None:
+        sql = f"SELECT rowid AS _rowid, * FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?"
+        key = (-1,)
+    else:
+        sql = (f"SELECT rowid AS _rowid, * FROM {table} "
+               f"WHERE (change_seq, rowid) > (?, ?) ORDER BY change_seq, rowid LIMIT ?")
+        key = (since_seq, 2 ** 63 - 1)  # strictly after the watermark
+
+    while True:
+        rows = conn.execute(sql, key + (chunk_size,), use_cache=False).fetchall()
+        if not rows:
+            return
+        rows = [dict(row) for row in rows]
+        yield rows
+        last = rows[-1]
+        key = (last["_rowid"],) if since_seq is None else (last["change_seq"], last["_rowid"])
+
+
+def _deletions_schema():
+    import pyarrow as pa
+
+    return pa.schema([pa.field("_rowid", pa.int64(), nullable=False), pa.field("change_seq", pa.int64(), nullable=False)])
+
+
+def iter_deletion_chunks(conn, table, chunk_size, since_seq):
+    """
+    Yield lists of {"_rowid", "change_seq"} dicts for rows of `table` deleted after `since_seq`.
+    """
+    sql = ("SELECT row_id AS _rowid, change_seq FROM row_deletions "
+           "WHERE table_name = ? AND change_seq > ? ORDER BY change_seq LIMIT ?")
+    while True:
+        rows = conn.execute(sql, (table, since_seq, chunk_size), use_cache=False).fetchall()
+        if not rows:
+            return
+        rows = [dict(row) for row in rows]
+        yield rows
+        since_seq = rows[-1]["change_seq"]
+
+
+class PartitionWriters:
+    """
+    Open Parquet writers per partition, closing the least recently used beyond `max_open`.
+    """
+
+    def __init__(self, root, schema, run_id, max_open=32):
+        self.root = root
+        self.schema = schema
+        self.run_id = run_id
+        self.max_open = max_open
+        self._writers = OrderedDict()
+        self._parts = {}
+        self.files = []
+
+    def write(self, partition, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = self._writers.get(partition)
+        if writer is None:
+            part = self._parts.get(partition, 0)
+            self._parts[partition] = part + 1
+            directory = os.path.join(self.root, partition) if partition else self.root
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{self.run_id}-{part:04d}.parquet")
+            if os.path.exists(path):
+                raise FileExistsError(f"Refusing to overwrite existing export file {path}")
+            writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+            self.files.append(path)
+            self._writers[partition] = writer
+            while len(self._writers) > self.max_open:
+                _, oldest = self._writers.popitem(last=False)
+                oldest.close()
+        else:
+            self._writers.move_to_end(partition)
+        writer.write_table(pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+
+def export_deletions(conn, table, out_dir, run_id, chunk_size, since_seq):
+    """
+    Export the rows of `table` deleted after `since_seq`; return how many.
+    """
+    writers = PartitionWriters(os.path.join(out_dir, DELETIONS_DIR, f"table={table}"), _deletions_schema(), run_id)
+    deleted = 0
+    try:
+        for rows in iter_deletion_chunks(conn, table, chunk_size, since_seq):
+            writers.write("", rows)
+            deleted += len(rows)
+    finally:
+        writers.close()
+    return deleted
+
+
+def export_table(conn, table, out_dir, run_id, chunk_size, since_seq=None):
+    """
+    Export one table; return the number of rows written.
+    """
+    writers = PartitionWriters(os.path.join(out_dir, table), _arrow_schema(conn, table), run_id)
+    partition_of = PARTITIONERS.get(table)
+    written = 0
+    try:
+        for rows in iter_chunks(conn, table, chunk_size, since_seq):
+            if partition_of is None:
+                writers.write("", rows)
+            else:
+                by_partition = {}
+                for row in rows:
+                    by_partition.setdefault(partition_of(row), []).append(row)
+                for partition, partition_rows in by_partition.items():
+                    writers.write(partition, partition_rows)
+            written += len(rows)
+    finally:
+        writers.close()
+    return written
+
+
+def load_state(out_dir):
+    path = os.path.join(out_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as state_file:
+        return json.load(state_file)
+
+
+def save_state(out_dir, state):
+    path = os.path.join(out_dir, STATE_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as state_file:
+        json.dump(state, state_file, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def export_database(out_dir, incremental=False, replace=False, chunk_size=10000, tables=EXPORT_TABLES):
+    """
+    Export `tables` to `out_dir`; return {table: rows written}, deletions included.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise SystemExit("Parquet export requires pyarrow: pip install pyarrow")
+
+    state = load_state(out_dir)
+    if incremental and state is None:
+        raise SystemExit(f"No previous export in {out_dir}; run a full export first.")
+    if not incremental and state is not None:
+        if not replace:
+            raise SystemExit(f"{out_dir} already holds an export; use --incremental or --replace.")
+        for table in tables:
+            shutil.rmtree(os.path.join(out_dir, table), ignore_errors=True)
+            shutil.rmtree(os.path.join(out_dir, DELETIONS_DIR, f"table={table}"), ignore_errors=True)
+        state = None
+
+    os.makedirs(out_dir, exist_ok=True)
+    state = state or {"tables": {}}
+    run_id = datetime.datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    counts = {}
+    with get_connection() as conn:
+        # One read transaction: every table comes from the same snapshot, and
+        # nothing written after the counter is read can fall below the watermark.
+        conn.execute("BEGIN")
+        try:
+            watermark = conn.execute("SELECT value FROM change_counter WHERE id = 1", use_cache=False).fetchone()[0]
+            for table in tables:
+                since_seq = state["tables"].get(table, {}).get("change_seq") if incremental else None
+                started = time.perf_counter()
+                written = export_table(conn, table, out_dir, run_id, chunk_size, since_seq)
+                deleted = 0
+                if since_seq is not None:
+                    deleted = export_deletions(conn, table, out_dir, run_id, chunk_size, since_seq)
+                state["tables"][table] = {"change_seq": watermark, "exported_at": run_id}
+                counts[table] = written + deleted
+                print(f"{table}: {written:,} rows, {deleted:,} deletions in {time.perf_counter() - started:.1f}s",
+                      file=sys.stderr)
+        finally:
+            conn.rollback()
+    save_state(out_dir, state)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m db.export", description="Export the database to partitioned Parquet files.")
+    parser.add_argument("out_dir", help="snapshot directory")
+    parser.add_argument("--incremental", action="store_true", help="append only rows changed since the last export")
+    parser.add_argument("--replace", action="store_true", help="overwrite an existing full export")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="rows per keyset page (default 10000)")
+    parser.add_argument("--tables", nargs="+", choices=EXPORT_TABLES, default=list(EXPORT_TABLES))
+    args = parser.parse_args(argv)
+
+    setup_database()
+    counts = export_database(args.out_dir, args.incremental, args.replace, args.chunk_size, args.tables)
+    print(f"Exported {sum(counts.values()):,} rows to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Per-rerun performance instrumentation.
+
+`rerun(page)` brackets one Streamlit script run, `phase(name)` (or the
+`timed` decorator) brackets a render step inside it, and the connection
+pool reports every execute/executemany/fetch through `record_query`. Each
+finished rerun is kept in memory for the debug panel and written as one
+JSON line to PERF_LOG_PATH; queries slower than PERF_SLOW_QUERY_MS are
+also logged on their own. The log rotates at PERF_LOG_MAX_BYTES and keeps
+PERF_LOG_BACKUPS old files, so a long-running server's disk use is bounded.
+"""
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from db.query_cache import normalize_sql
+
+SLOW_QUERY_MS = float(os.environ.get("PERF_SLOW_QUERY_MS", "200"))
+PERF_LOG_PATH = os.environ.get("PERF_LOG_PATH", os.path.join("data", "logs", "perf.jsonl"))
+PERF_LOG_MAX_BYTES = int(os.environ.get("PERF_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+PERF_LOG_BACKUPS = int(os.environ.get("PERF_LOG_BACKUPS", "3"))
+RECENT_RERUNS = int(os.environ.get("PERF_RECENT_RERUNS", "20"))
+
+_local = threading.local()
+_recent = deque(maxlen=RECENT_RERUNS)
+_recent_lock = threading.Lock()
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def _perf_logger():
+    """
+    Return the JSON-lines logger, creating the log file on first use.
+    """
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                logger = logging.getLogger("meatball.perf")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                try:
+                    os.makedirs(os.path.dirname(PERF_LOG_PATH) or ".", exist_ok=True)
+                    handler = logging.handlers.RotatingFileHandler(
+                        PERF_LOG_PATH, maxBytes=PERF_LOG_MAX_BYTES, backupCount=PERF_LOG_BACKUPS, encoding="utf-8",
+                    )
+                    handler.setFormatter(logging.Formatter("%(message)s"))
+                    logger.addHandler(handler)
+                except OSError:
+                    logger.addHandler(logging.NullHandler())
+                _logger = logger
+    return _logger
+
+
+def _log(event):
+    _perf_logger().info(json.dumps(event, default=str, ensure_ascii=False))
+
+
+@contextmanager
+def rerun(page):
+    """
+    Time one script run of `page` and record it once it finishes.
+    """
+    record = {"page": page, "started_at": time.time(), "phases": [], "queries": []}
+    _local.rerun = record
+    _local.stack = []
+    started = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _local.rerun = None
+        record["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        record["db_ms"] = round(sum(query["ms"] for query in record["queries"]), 2)
+        record["query_count"] = len(record["queries"])
+        with _recent_lock:
+            _recent.append(record)
+        _log({"event": "rerun", **record})
+
+
+@contextmanager
+def phase(name):
+    """
+    Time one render step (a component) of the current rerun.
+    """
+    stack = getattr(_local, "stack", None)
+    if stack is not None:
+        stack.append(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        if stack:
+            stack.pop()
+        record = getattr(_local, "rerun", None)
+        if record is not None:
+            record["phases"].append({"component": name, "depth": len(stack or ()), "ms": round(elapsed, 2)})
+
+
+def timed(name=None):
+    """
+    Decorator form of `phase`; defaults to the function's module.qualname.
+    """
+    def decorate(function):
+        label = name or f"{function.__module__}.{function.__qualname__}"
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with phase(label):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def capture_context():
+    """
+    Return the current rerun and component so worker threads can report into them.
+    """
+    return getattr(_local, "rerun", None), list(getattr(_local, "stack", None) or ())
+
+
+@contextmanager
+def use_context(context):
+    """
+    Attribute work done on this (worker) thread to a context from `capture_context`.
+    """
+    previous = getattr(_local, "rerun", None), getattr(_local, "stack", None)
+    _local.rerun, _local.stack = context[0], list(context[1])
+    try:
+        yield
+    finally:
+        _local.rerun, _local.stack = previous
+
+
+def current_component():
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+def record_query(operation, sql, elapsed, rows=None, cached=False):
+    """
+    Attribute one database call to the current page and component.
+    """
+    elapsed_ms = elapsed * 1000
+    record = getattr(_local, "rerun", None)
+    statement = normalize_sql(sql)
+    entry = {
+        "op": operation,
+        "sql": statement[:200],
+        "ms": round(elapsed_ms, 3),
+        "rows": rows,
+        "cached": cached,
+        "component": current_component(),
+    }
+    if record is not None:
+        record["queries"].append(entry)
+    if elapsed_ms >= SLOW_QUERY_MS:
+        _log({
+            "event": "slow_query",
+            "page": record["page"] if record is not None else None,
+            "threshold_ms": SLOW_QUERY_MS,
+            **entry,
+            "sql": statement,
+        })
+
+
+def recent_reruns():
+    """
+    Return the last finished reruns, newest first.
+    """
+    with _recent_lock:
+        return list(reversed(_recent))
+
+
+class TimedCursor:
+    """
+    Cursor proxy that reports fetch time to the instrumentation.
+    """
+
+    def __init__(self, cursor, sql):
+        self._cursor = cursor
+        self._sql = sql
+
+    def _timed_fetch(self, operation, method, *args):
+        started = time.perf_counter()
+        rows = method(*args)
+        count = None if rows is None else (len(rows) if isinstance(rows, list) else 1)
+        record_query(operation, self._sql, time.perf_counter() - started, rows=count)
+        return rows
+
+    def fetchall(self):
+        return self._timed_fetch("fetchall", self._cursor.fetchall)
+
+    def fetchone(self):
+        return self._timed_fetch("fetchone", self._cursor.fetchone)
+
+    def fetchmany(self, size=1):
+        return self._timed_fetch("fetchmany", self._cursor.fetchmany, size)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
@@ -0,0 +1,101 @@
+"""
+Versioned schema migrations.
+
+Each migration is a module in this package named `m<version>_<name>.py`
+that defines `upgrade(conn)`. Migrations run in version order and each
+applied version is recorded in the `schema_version` table, so a database
+that is already current costs two small reads and no DDL.
+"""
+import datetime
+import importlib
+import pkgutil
+import re
+
+_MODULE_PATTERN = re.compile(r"^m(\d+)_(\w+)$")
+
+
+def load_migrations():
+    """
+    Return the available migrations as (version, name, module) tuples, in order.
+    """
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = _MODULE_PATTERN.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{__name__}.{module_info.name}")
+        migrations.append((int(match.group(1)), match.group(2), module))
+    migrations.sort(key=lambda migration: migration[0])
+
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions in {__name__}: {versions}")
+    return migrations
+
+
+def latest_version():
+    """
+    Return the highest migration version shipped with the code.
+    """
+    migrations = load_migrations()
+    return migrations[-1][0] if migrations else 0
+
+
+def applied_version(conn):
+    """
+    Return the schema version recorded in the database, or 0 for a fresh database.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchall()
+    if not exists:
+        return 0
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def migrate(conn):
+    """
+    Apply every migration newer than the database's schema version.
+
+    Returns the list of versions that were applied.
+    """
+    current = applied_version(conn)
+    pending = [migration for migration in load_migrations() if migration[0] > current]
+    if not pending:
+        return []
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    """)
+
+    applied = []
+    for version, name, module in pending:
+        module.upgrade(conn)
+        conn.execute(
+            "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+            (version, name, datetime.datetime.now().isoformat(" ", timespec="seconds")),
+        )
+        conn.commit()
+        applied.append(version)
+    return applied
+
+
+def column_exists(conn, table, column):
+    """
+    Return True if `table` already has `column` (including generated columns).
+    """
+    rows = conn.execute(f"PRAGMA table_xinfo({table})").fetchall()
+    return any(row[1] == column for row in rows)
+
+
+def add_column(conn, table, column, definition):
+    """
+    Add a column unless it is already there, so re-running a half-applied migration is safe.
+    """
+    if not column_exists(conn, table, column):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
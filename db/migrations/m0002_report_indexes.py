@@ -0,0 +1,60 @@
+"""
+Covering indexes for the report queries and indexed week/month keys.
+
+`entry_week` and `entry_month` are plain columns filled in by triggers at
+insert time, so every writer gets them for free and the weekly/monthly
+reports group on an index instead of evaluating strftime() for every row.
+(Virtual generated columns would not let the indexes below be covering.)
+"""
+from db.migrations import add_column
+
+
+def upgrade(conn):
+    add_column(conn, "daily_entries", "entry_week", "TEXT")
+    add_column(conn, "daily_entries", "entry_month", "TEXT")
+
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_daily_entries_period_insert
+        AFTER INSERT ON daily_entries
+        BEGIN
+            UPDATE daily_entries
+            SET entry_week = strftime('%Y-%W', NEW.date), entry_month = strftime('%Y-%m', NEW.date)
+            WHERE id = NEW.id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_daily_entries_period_update
+        AFTER UPDATE OF date ON daily_entries
+        BEGIN
+            UPDATE daily_entries
+            SET entry_week = strftime('%Y-%W', NEW.date), entry_month = strftime('%Y-%m', NEW.date)
+            WHERE id = NEW.id;
+        END
+    """)
+    conn.execute("""
+        UPDATE daily_entries
+        SET entry_week = strftime('%Y-%W', date), entry_month = strftime('%Y-%m', date)
+        WHERE entry_week IS NULL OR entry_month IS NULL
+    """)
+
+    # Date-range reports: shop = ? AND date BETWEEN ? AND ? [AND metric = ?]
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_daily_entries_shop_date
+        ON daily_entries (shop, date, metric, value)
+    """)
+
+    # Weekly / monthly totals: shop = ? [AND metric ...] GROUP BY period
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_daily_entries_shop_week
+        ON daily_entries (shop, entry_week, metric, value)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_daily_entries_shop_month
+        ON daily_entries (shop, entry_month, metric, value)
+    """)
+
+    # Inventory usage: year = ? AND week_number = ? AND inventory_type = ?
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_weekly_inventory_week
+        ON weekly_inventory (year, week_number, inventory_type, item_id, quantity)
+    """)
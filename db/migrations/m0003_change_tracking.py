@@ -0,0 +1,40 @@
+"""
+Row-level change tracking for incremental exports and sync.
+
+Every insert or update stamps the row's `change_seq` with the next value
+of a database-wide counter. SQLite serialises writers, so a reader that
+has seen everything up to sequence N will only ever find rows with a
+higher sequence in later commits; `change_seq > N` is an exact
+"changed since" watermark. Existing rows start at 0.
+"""
+from db.migrations import add_column
+
+TRACKED_TABLES = ("daily_entries", "inventory_items", "weekly_inventory", "weekly_tracking", "tasks", "accounts")
+
+
+def upgrade(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS change_counter (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            value INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO change_counter (id, value) VALUES (1, 0)")
+
+    for table in TRACKED_TABLES:
+        add_column(conn, table, "change_seq", "INTEGER NOT NULL DEFAULT 0")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_change_seq ON {table} (change_seq)")
+        for event in ("INSERT", "UPDATE"):
+            # The WHEN clause keeps the trigger's own UPDATE from re-firing it.
+            condition = "" if event == "INSERT" else "WHEN NEW.change_seq IS OLD.change_seq"
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_change_seq_{event.lower()}
+                AFTER {event} ON {table}
+                {condition}
+                BEGIN
+                    UPDATE change_counter SET value = value + 1 WHERE id = 1;
+                    UPDATE {table}
+                    SET change_seq = (SELECT value FROM change_counter WHERE id = 1)
+                    WHERE rowid = NEW.rowid;
+                END
+            """)
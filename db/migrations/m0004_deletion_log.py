@@ -0,0 +1,29 @@
+"""
+Log deleted rows so replicas and incremental consumers can apply deletes.
+
+Each delete from a tracked table records the table name, the deleted
+rowid and the next `change_seq`, in the same sequence space as
+inserts and updates (see m0003_change_tracking).
+"""
+from db.migrations.m0003_change_tracking import TRACKED_TABLES
+
+
+def upgrade(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS row_deletions (
+            change_seq INTEGER PRIMARY KEY,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL
+        )
+    """)
+
+    for table in TRACKED_TABLES:
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_change_seq_delete
+            AFTER DELETE ON {table}
+            BEGIN
+                UPDATE change_counter SET value = value + 1 WHERE id = 1;
+                INSERT INTO row_deletions (change_seq, table_name, row_id)
+                VALUES ((SELECT value FROM change_counter WHERE id = 1), '{table}', OLD.rowid);
+            END
+        """)
@@ -0,0 +1,21 @@
+"""
+Pre-pivoted per-shop, per-day summary of daily_entries (see db.daily_summary).
+
+Only the registry-independent columns are created here. The metric
+columns, the triggers and the backfill follow the shop registry, so
+db.daily_summary.ensure_current adds them; setup_database runs it right
+after the migrations.
+"""
+
+
+def upgrade(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS daily_shop_summary (
+            date TEXT NOT NULL,
+            shop TEXT NOT NULL,
+            revenue INTEGER NOT NULL DEFAULT 0,
+            cost INTEGER NOT NULL DEFAULT 0,
+            profit INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (shop, date)
+        ) WITHOUT ROWID
+    """)
@@ -0,0 +1,22 @@
+"""
+Weekly and monthly per-shop rollups of daily_shop_summary (see db.daily_summary).
+
+Periods were keyed as strftime() text here; migration 7 re-keys them on
+the calendar. Metric columns, triggers and the rollup rebuild follow the
+shop registry and are done by db.daily_summary.ensure_current.
+"""
+
+
+def upgrade(conn):
+    for table in ("weekly_shop_rollup", "monthly_shop_rollup"):
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                shop TEXT NOT NULL,
+                period TEXT NOT NULL,
+                days INTEGER NOT NULL DEFAULT 0,
+                revenue INTEGER NOT NULL DEFAULT 0,
+                cost INTEGER NOT NULL DEFAULT 0,
+                profit INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (shop, period)
+            ) WITHOUT ROWID
+        """)
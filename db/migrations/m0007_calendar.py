@@ -0,0 +1,47 @@
+"""
+Calendar dimension table, and weekly/monthly rollups re-keyed on its
+integer ISO week and month keys (see db.calendar_table).
+
+The calendar's rows, the rollups' metric columns and contents and their
+triggers follow the code and the shop registry; dropping the rollup
+triggers makes db.daily_summary.ensure_current rebuild all of them.
+"""
+
+
+def upgrade(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS calendar (
+            date_key INTEGER PRIMARY KEY,
+            date TEXT NOT NULL UNIQUE,
+            year INTEGER NOT NULL,
+            iso_year INTEGER NOT NULL,
+            iso_week INTEGER NOT NULL,
+            iso_week_key INTEGER NOT NULL,
+            month INTEGER NOT NULL,
+            month_key INTEGER NOT NULL,
+            quarter INTEGER NOT NULL,
+            weekday INTEGER NOT NULL,
+            is_business_day INTEGER NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_calendar_iso_week ON calendar (iso_week_key, date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_calendar_month ON calendar (month_key, date)")
+
+    for event in ("insert", "update", "delete"):
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_daily_shop_summary_rollup_{event}")
+    # Migration 6 keyed periods as strftime() text; recreate them as integer keys.
+    for table in ("weekly_shop_rollup", "monthly_shop_rollup"):
+        columns = {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({table})", use_cache=False).fetchall()}
+        if columns.get("period", "").upper() == "TEXT":
+            conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                shop TEXT NOT NULL,
+                period INTEGER NOT NULL,
+                days INTEGER NOT NULL DEFAULT 0,
+                revenue INTEGER NOT NULL DEFAULT 0,
+                cost INTEGER NOT NULL DEFAULT 0,
+                profit INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (shop, period)
+            ) WITHOUT ROWID
+        """)
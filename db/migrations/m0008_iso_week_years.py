@@ -0,0 +1,56 @@
+"""
+Key inventory weeks by ISO year and add an integer `iso_week_key`.
+
+Inventory counts used to store the calendar year of `record_date` next to
+its ISO week, so 2024-12-30 (ISO 2025-W01) was saved as week 1 of 2024 and
+overwrote that week's counts. Existing rows are moved to their ISO year
+and weekly_tracking is re-derived from the counts. `iso_week_key`
+(ISO year * 100 + week, as in the calendar table) is a virtual generated
+column on both tables, so reports seek one indexed integer.
+"""
+import datetime
+
+from db.migrations import add_column
+
+
+def upgrade(conn):
+    rows = conn.execute(
+        "SELECT id, record_date, week_number, year FROM weekly_inventory", use_cache=False
+    ).fetchall()
+    moves = []
+    for row_id, record_date, week_number, year in (tuple(row) for row in rows):
+        iso_year, iso_week, _ = datetime.date.fromisoformat(str(record_date)[:10]).isocalendar()
+        if (iso_year, iso_week) != (year, week_number):
+            moves.append((iso_week, iso_year, row_id))
+    for iso_week, iso_year, row_id in moves:
+        # A count already stored under the right key for the same item and
+        # type is the same week's count; the moved row wins. Deleted
+        # explicitly (not UPDATE OR REPLACE) so the delete triggers record
+        # it in row_deletions.
+        conn.execute("""
+            DELETE FROM weekly_inventory
+            WHERE week_number = ? AND year = ? AND id != ?
+              AND (item_id, inventory_type) = (SELECT item_id, inventory_type FROM weekly_inventory WHERE id = ?)
+        """, (iso_week, iso_year, row_id, row_id))
+        conn.execute("UPDATE weekly_inventory SET week_number = ?, year = ? WHERE id = ?", (iso_week, iso_year, row_id))
+
+    if moves:
+        conn.execute("DELETE FROM weekly_tracking")
+        conn.execute("""
+            INSERT INTO weekly_tracking (week_number, year, start_inventory, end_inventory)
+            SELECT week_number, year,
+                   MAX(inventory_type = 'start'), MAX(inventory_type = 'end')
+            FROM weekly_inventory
+            GROUP BY year, week_number
+        """)
+
+    for table in ("weekly_inventory", "weekly_tracking"):
+        add_column(conn, table, "iso_week_key", "INTEGER GENERATED ALWAYS AS (year * 100 + week_number) VIRTUAL")
+
+    # Inventory usage / profit vs. inventory: iso_week_key = ? AND inventory_type = ?
+    conn.execute("DROP INDEX IF EXISTS idx_weekly_inventory_week")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_weekly_inventory_iso_week
+        ON weekly_inventory (iso_week_key, inventory_type, item_id, quantity)
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_weekly_tracking_iso_week ON weekly_tracking (iso_week_key)")
@@ -0,0 +1,19 @@
+"""
+Drop the `entry_week` / `entry_month` keys of daily_entries (migration 2).
+
+Weekly and monthly reports read the calendar-keyed rollups
+(db.daily_summary), so nothing reads these columns any more; their
+triggers and indexes only slowed down every insert.
+"""
+from db.migrations import column_exists
+
+
+def upgrade(conn):
+    conn.execute("DROP TRIGGER IF EXISTS trg_daily_entries_period_insert")
+    conn.execute("DROP TRIGGER IF EXISTS trg_daily_entries_period_update")
+    conn.execute("DROP INDEX IF EXISTS idx_daily_entries_shop_week")
+    conn.execute("DROP INDEX IF EXISTS idx_daily_entries_shop_month")
+
+    for column in ("entry_week", "entry_month"):
+        if column_exists(conn, "daily_entries", column):
+            conn.execute(f"ALTER TABLE daily_entries DROP COLUMN {column}")
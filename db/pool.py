@@ -0,0 +1,353 @@
+import threading
+import time
+from collections import deque
+
+from db.instrumentation import TimedCursor, record_query
+from db.query_cache import CachedCursor, is_ddl, table_written
+
+
+class PoolTimeoutError(Exception):
+    """
+    Raised when no connection becomes available within the checkout timeout.
+    """
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of database connections shared by every
+    Streamlit session in the process.
+
+    Connections are created lazily through `connect`, health-checked on
+    checkout, closed again once they have been idle for too long, and
+    replaced transparently when they turn out to be broken.
+    """
+
+    def __init__(self, connect, max_size=5, checkout_timeout=30.0,
+                 max_idle_time=300.0, health_check_after=10.0, reap_interval=60.0, cache=None):
+        self._connect = connect
+        self.cache = cache
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.max_idle_time = max_idle_time
+        self.health_check_after = health_check_after
+        self.reap_interval = reap_interval
+
+        self._idle = deque()  # (connection, last_used) pairs, most recent on the right
+        self._size = 0  # idle + checked out
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._reaper = None
+        self._closed = False
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "timeouts": 0,
+            "reconnects": 0,
+            "reaped": 0,
+        }
+
+    # ------------------------------------------------------------------ checkout
+
+    def connection(self):
+        """
+        Return a context manager wrapping a pooled connection.
+
+        Nested calls on the same thread share the connection that is already
+        checked out, so recursive helpers never hold more than one slot.
+        """
+        held = getattr(self._local, "held", None)
+        if held is not None:
+            held.depth += 1
+            return held
+        held = PooledConnection(self, self._acquire())
+        self._local.held = held
+        return held
+
+    def _acquire(self):
+        self._ensure_reaper()
+        started = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool has been closed.")
+                self._reap_locked(time.monotonic())
+
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    self._record_wait(started)
+                    break
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    self._stats["misses"] += 1
+                    self._record_wait(started)
+                    conn, last_used = None, None
+                    break
+
+                if started is None:
+                    started = time.monotonic()
+                    self._stats["waits"] += 1
+                remaining = self.checkout_timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    self._record_wait(started)
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self.checkout_timeout:.0f}s."
+                    )
+                self._cond.wait(remaining)
+
+        if conn is None:
+            return self._open()
+
+        # Reused connection: ping it if it has been sitting idle for a while.
+        if time.monotonic() - last_used >= self.health_check_after and not self._is_healthy(conn):
+            self._close_quietly(conn)
+            with self._cond:
+                self._stats["reconnects"] += 1
+            return self._open()
+
+        with self._cond:
+            self._stats["hits"] += 1
+        return conn
+
+    def _open(self):
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def _record_wait(self, started):
+        if started is None:
+            return
+        waited = time.monotonic() - started
+        self._stats["wait_time_total"] += waited
+        self._stats["wait_time_max"] = max(self._stats["wait_time_max"], waited)
+
+    # ------------------------------------------------------------------- checkin
+
+    def _release(self, conn, broken=False):
+        if getattr(self._local, "held", None) is not None and self._local.held.raw is conn:
+            self._local.held = None
+
+        if broken or self._closed:
+            self._close_quietly(conn)
+            with self._cond:
+                self._size -= 1
+                if broken:
+                    self._stats["reconnects"] += 1
+                self._cond.notify()
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    # ------------------------------------------------------------------- reaping
+
+    def _reap_locked(self, now):
+        while self._idle and now - self._idle[0][1] > self.max_idle_time:
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            self._stats["reaped"] += 1
+            self._close_quietly(conn)
+
+    def _ensure_reaper(self):
+        if self._reaper is not None or self.reap_interval <= 0:
+            return
+        with self._cond:
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self._reap_forever, name="db-pool-reaper", daemon=True)
+                self._reaper.start()
+
+    def _reap_forever(self):
+        while not self._closed:
+            time.sleep(self.reap_interval)
+            with self._cond:
+                self._reap_locked(time.monotonic())
+
+    # ------------------------------------------------------------------- helpers
+
+    @staticmethod
+    def _is_healthy(conn):
+        try:
+            conn.execute("SELECT 1").fetchall()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def stats(self):
+        """
+        Return a snapshot of pool usage counters.
+        """
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot["size"] = self._size
+            snapshot["idle"] = len(self._idle)
+            snapshot["in_use"] = self._size - len(self._idle)
+        checkouts = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_rate"] = snapshot["hits"] / checkouts if checkouts else 0.0
+        snapshot["wait_time_avg"] = snapshot["wait_time_total"] / snapshot["waits"] if snapshot["waits"] else 0.0
+        return snapshot
+
+    def close(self):
+        """
+        Close every idle connection and refuse further checkouts.
+        """
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.popleft()
+                self._size -= 1
+                self._close_quietly(conn)
+            self._cond.notify_all()
+
+
+class PooledConnection:
+    """
+    Context-manager proxy around a pooled connection.
+
+    Behaves like the underlying DB-API connection (`execute`, `commit`,
+    `row_factory`, ...) but returns the connection to the pool on exit
+    instead of closing it. SELECTs are answered from the pool's query
+    cache when possible, and writes invalidate the tables they touch.
+    """
+
+    def __init__(self, pool, conn):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "raw", conn)
+        object.__setattr__(self, "depth", 1)
+        object.__setattr__(self, "_broken", False)
+        object.__setattr__(self, "_dirty", False)
+        object.__setattr__(self, "_written", set())
+        object.__setattr__(self, "_row_factory", getattr(conn, "row_factory", None))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.depth -= 1
+        if self.depth > 0:
+            return False
+        if self._dirty and not self._broken:
+            # Never hand a half-finished transaction to the next borrower.
+            try:
+                self.raw.rollback()
+            except Exception:
+                self._broken = True
+            self._invalidate_written()
+        if not self._broken and hasattr(self.raw, "row_factory"):
+            self.raw.row_factory = self._row_factory
+        self._pool._release(self.raw, broken=self._broken)
+        return False
+
+    def execute(self, sql, parameters=(), use_cache=True):
+        cache = self._pool.cache if use_cache else None
+        # Inside an open write transaction, reads must see our own changes.
+        tables = cache.cacheable(sql) if cache is not None and not self._dirty else None
+        started = time.perf_counter()
+        if tables:
+            key = cache.key(sql, parameters)
+            hit = cache.get(key)
+            if hit is not None:
+                record_query("execute", sql, time.perf_counter() - started, rows=len(hit[0]), cached=True)
+                return CachedCursor(*hit)
+            generations = cache.snapshot(tables)
+            cursor = self._call(self.raw.execute, sql, parameters)
+            rows = cursor.fetchall()
+            record_query("execute+fetchall", sql, time.perf_counter() - started, rows=len(rows))
+            cache.put(key, rows, cursor.description, generations)
+            return CachedCursor(rows, cursor.description)
+
+        cursor = self._call(self.raw.execute, sql, parameters)
+        record_query("execute", sql, time.perf_counter() - started)
+        if is_write(sql):
+            self._note_write(sql)
+            return cursor
+        return TimedCursor(cursor, sql)
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        cursor = self._call(self.raw.executemany, sql, seq_of_parameters)
+        record_query("executemany", sql, time.perf_counter() - started, rows=getattr(cursor, "rowcount", None))
+        self._note_write(sql)
+        return cursor
+
+    def commit(self):
+        started = time.perf_counter()
+        self._call(self.raw.commit)
+        record_query("commit", "COMMIT", time.perf_counter() - started)
+        self._dirty = False
+        self._invalidate_written()
+
+    def rollback(self):
+        self._call(self.raw.rollback)
+        self._dirty = False
+        self._invalidate_written()
+
+    def _note_write(self, sql):
+        self._dirty = True
+        cache = self._pool.cache
+        if cache is None:
+            return
+        if is_ddl(sql):
+            cache.clear()
+            return
+        table = table_written(sql)
+        if table:
+            self._written.add(table)
+            # Bump now as well as on commit: some drivers autocommit each statement.
+            cache.bump([table])
+
+    def _invalidate_written(self):
+        if self._written and self._pool.cache is not None:
+            self._pool.cache.bump(self._written)
+        self._written.clear()
+
+    def ping(self):
+        """
+        Return True if the database answers a trivial query.
+        """
+        return self._pool._is_healthy(self.raw)
+
+    def close(self):
+        """
+        Pooled connections are closed by the pool; closing a borrowed one is a no-op.
+        """
+
+    def _call(self, method, *args):
+        try:
+            return method(*args)
+        except Exception:
+            # Distinguish SQL errors from a dead link: a broken connection
+            # cannot answer a trivial query and is dropped on checkin.
+            if not self._pool._is_healthy(self.raw):
+                self._broken = True
+            raise
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    def __setattr__(self, name, value):
+        if name == "depth" or name.startswith("_"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.raw, name, value)
+
+
+def is_write(sql):
+    head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+    return head not in ("SELECT", "WITH", "PRAGMA", "EXPLAIN")
@@ -0,0 +1,270 @@
+"""
+Background precomputation of the standard reports.
+
+A daemon thread (a small in-process stand-in for cron) runs every job in
+STANDARD_REPORTS on its schedule and again right after a write to one of
+the tables it reads, and stores the result rows in a local SQLite file
+(`precomputed_reports` in DB_PRECOMPUTE_PATH). Pages look results up with
+`get_precomputed(name, params)` and show them instantly with their "as of"
+time, falling back to a live query when nothing fresh is stored.
+
+Writes are noticed through the query cache's per-table generation
+counters (db.query_cache), which every in-process write bumps, including
+trigger-derived tables and replica syncs. With the cache disabled there
+is no way to tell a stored result is stale, so nothing is precomputed and
+pages always run the live query.
+"""
+import datetime
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from db.database import get_connection, get_query_cache
+from db.report_queries import PROFIT_TOTALS_BETWEEN, WEEKLY_INVENTORY_USAGE, WEEKLY_TRACKING_STATUS
+
+logger = logging.getLogger(__name__)
+
+PRECOMPUTE_PATH = os.environ.get("DB_PRECOMPUTE_PATH", os.path.join("data", "report_cache.db"))
+# How often the scheduler checks for due jobs and fresh writes, in seconds
+PRECOMPUTE_TICK = float(os.environ.get("DB_PRECOMPUTE_TICK", "2"))
+
+
+class PrecomputeJob:
+    """
+    One precomputed report: which queries to run, how often, and on which tables' writes.
+
+    `variants()` returns [(params, sql, sql_params, columns)]; `params`
+    identifies the stored result (e.g. the date range). Jobs also rerun
+    when the date changes, so date-relative reports roll over at midnight.
+    """
+
+    def __init__(self, name, variants, every, tables):
+        self.name = name
+        self.variants = variants
+        self.every = every
+        self.tables = tables
+
+
+class Precomputed:
+    """
+    A stored report result.
+    """
+
+    def __init__(self, columns, rows, computed_at):
+        self.columns = columns
+        self.rows = rows
+        self.computed_at = computed_at
+
+    def records(self):
+        return [dict(zip(self.columns, row)) for row in self.rows]
+
+
+def _iso(day):
+    return day.isoformat()
+
+
+def _profit_totals_variants():
+    today = datetime.date.today()
+    yesterday = today - datetime.timedelta(days=1)
+    columns = ["shop", "revenue", "cost", "profit", "days"]
+    return [((_iso(day), _iso(day)), PROFIT_TOTALS_BETWEEN, (_iso(day), _iso(day)), columns)
+            for day in (today, yesterday)]
+
+
+def _sales_variants():
+    # Imported here (in the worker) so starting the scheduler does not load pandas.
+    from db.report_builder import Report
+
+    variants = []
+    for grain in ("week", "month"):
+        report = Report("Meatball Stand", {"sales": "Total Sales"}, grain=grain)
+        sql, params = report.query()
+        variants.append(((grain,), sql, params, report.labels))
+    return variants
+
+
+def _completed_weeks_variants():
+    columns = ["iso_week_key", "week_number", "year", "start_inventory", "end_inventory"]
+    return [((), WEEKLY_TRACKING_STATUS, (), columns)]
+
+
+def _inventory_usage_variants():
+    """
+    Usage of the most recent week with both start and end counts.
+    """
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT iso_week_key FROM weekly_tracking WHERE start_inventory AND end_inventory "
+            "ORDER BY iso_week_key DESC LIMIT 1"
+        ).fetchone()
+    if row is None:
+        return []
+    return [((row[0],), WEEKLY_INVENTORY_USAGE, (row[0],), ["name", "amount_used", "cost", "total_cost"])]
+
+
+STANDARD_REPORTS = [
+    PrecomputeJob("profit_totals", _profit_totals_variants, every=300,
+                  tables=["daily_entries", "daily_shop_summary"]),
+    PrecomputeJob("meatball_sales", _sales_variants, every=900,
+                  tables=["daily_shop_summary", "weekly_shop_rollup", "monthly_shop_rollup"]),
+    PrecomputeJob("completed_weeks", _completed_weeks_variants, every=900, tables=["weekly_tracking"]),
+    PrecomputeJob("inventory_usage", _inventory_usage_variants, every=900,
+                  tables=["weekly_tracking", "weekly_inventory", "inventory_items"]),
+]
+
+
+class PrecomputeScheduler:
+    """
+    Runs precompute jobs in a background thread and serves their stored results.
+    """
+
+    def __init__(self, path, jobs, tick=PRECOMPUTE_TICK):
+        self.path = path
+        self.jobs = {job.name: job for job in jobs}
+        self.tick = tick
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._store = sqlite3.connect(path, check_same_thread=False)
+        self._store.execute("""
+            CREATE TABLE IF NOT EXISTS precomputed_reports (
+                name TEXT NOT NULL,
+                params TEXT NOT NULL,
+                columns TEXT NOT NULL,
+                rows TEXT NOT NULL,
+                computed_at TEXT NOT NULL,
+                PRIMARY KEY (name, params)
+            )
+        """)
+        self._store.commit()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker = None
+        # name -> (monotonic time of last run, date of last run, table generations seen)
+        self._state = {}
+        self.last_error = None
+
+    @staticmethod
+    def _key(params):
+        return json.dumps(list(params), default=str)
+
+    def _generations(self, job):
+        cache = get_query_cache()
+        return cache.snapshot(job.tables) if cache is not None else ()
+
+    # ------------------------------------------------------------------ worker
+
+    def start(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._worker = threading.Thread(target=self._run, name="db-precompute", daemon=True)
+        self._worker.start()
+
+    def _run(self):
+        while True:
+            for job in list(self.jobs.values()):
+                try:
+                    self._run_if_due(job)
+                except Exception as e:
+                    self.last_error = f"{job.name}: {type(e).__name__}: {e}"
+                    logger.warning("Precomputing %s failed: %s", job.name, e)
+            self._wakeup.wait(self.tick)
+            self._wakeup.clear()
+
+    def _run_if_due(self, job):
+        generations = self._generations(job)
+        state = self._state.get(job.name)
+        if state is not None:
+            ran_at, ran_on, seen = state
+            if (time.monotonic() - ran_at < job.every and seen == generations
+                    and ran_on == datetime.date.today()):
+                return
+        self.run_job(job.name, generations)
+
+    def run_job(self, name, generations=None):
+        """
+        Compute and store every variant of job `name` now.
+        """
+        job = self.jobs[name]
+        # Snapshot before querying: a write landing mid-run triggers another run.
+        generations = self._generations(job) if generations is None else generations
+        variants = job.variants()
+        results = []
+        with get_connection() as conn:
+            for params, sql, sql_params, columns in variants:
+                rows = conn.execute(sql, sql_params).fetchall()
+                results.append((params, columns, [list(tuple(row)) for row in rows]))
+
+        computed_at = datetime.datetime.now().isoformat(" ", timespec="seconds")
+        with self._lock:
+            self._store.execute("DELETE FROM precomputed_reports WHERE name = ?", (name,))
+            self._store.executemany(
+                "INSERT INTO precomputed_reports (name, params, columns, rows, computed_at) VALUES (?, ?, ?, ?, ?)",
+                [(name, self._key(params), json.dumps(columns), json.dumps(rows, default=str), computed_at)
+                 for params, columns, rows in results],
+            )
+            self._store.commit()
+        self._state[name] = (time.monotonic(), datetime.date.today(), generations)
+        self.last_error = None
+
+    # ----------------------------------------------------------------- lookups
+
+    def get(self, name, params=()):
+        """
+        Return the stored Precomputed result for `name` and `params`, or None.
+
+        Results of a job whose tables were written since it last ran are not
+        served; the worker recomputes them within a tick. Nor are results
+        older than twice the job's interval (the worker keeps failing, or the
+        data changed through another process, e.g. the bulk importer), so
+        pages fall back to a live query. With the query cache disabled writes
+        go unnoticed, so nothing is served.
+        """
+        if get_query_cache() is None:
+            return None
+        job = self.jobs.get(name)
+        state = self._state.get(name)
+        if job is None or state is None or state[2] != self._generations(job):
+            return None
+        with self._lock:
+            row = self._store.execute(
+                "SELECT columns, rows, computed_at FROM precomputed_reports WHERE name = ? AND params = ?",
+                (name, self._key(params)),
+            ).fetchone()
+        if row is None:
+            return None
+        age = datetime.datetime.now() - datetime.datetime.fromisoformat(row[2])
+        if age.total_seconds() > 2 * job.every:
+            return None
+        return Precomputed(json.loads(row[0]), json.loads(row[1]), row[2])
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """
+    Return the process-wide precompute scheduler, starting it on first use.
+    """
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = PrecomputeScheduler(PRECOMPUTE_PATH, STANDARD_REPORTS)
+                _scheduler.start()
+    return _scheduler
+
+
+def get_precomputed(name, params=()):
+    """
+    Return the fresh precomputed result of a standard report, or None.
+    """
+    if get_query_cache() is None:
+        # Without the cache's write signal results can't be kept fresh; don't start the worker.
+        return None
+    return get_scheduler().get(name, params)
@@ -0,0 +1,90 @@
+"""
+Profit engine: evaluates the pricing in the shop registry (db.shops).
+
+`add_profit_columns` takes a DataFrame with one row per shop-day and one
+column per metric (the daily_shop_summary column names) and computes
+revenue, cost and profit for every shop and pricing period over whole
+columns at once. db.profit_sql renders the same formulas as SQL for the
+triggers that maintain daily_shop_summary, so the table and the reports
+never disagree.
+"""
+import numpy as np
+import pandas as pd
+
+from db.shops import METRIC_COLUMNS, SHOPS
+
+
+def _as_number(values):
+    """
+    Return `values` as integers when every value is whole, as the app shows baht.
+    """
+    if len(values) and np.all(np.isfinite(values)) and np.all(values == np.round(values)):
+        return values.astype(np.int64)
+    return values
+
+
+def add_profit_columns(frame, date_column="date", shop_column="shop"):
+    """
+    Return a copy of `frame` with revenue, cost and profit columns added.
+
+    Metric columns that are missing or NaN count as zero; rows of shops that
+    are not in the registry get zero revenue, cost and profit.
+    """
+    result = frame.copy()
+    for column in METRIC_COLUMNS:
+        if column not in result:
+            result[column] = 0
+
+    rows = len(result)
+    shops = result[shop_column].to_numpy()
+    dates = result[date_column].astype(str).str[:10].to_numpy(dtype="U10")
+    revenue = np.zeros(rows)
+    variable_cost = np.zeros(rows)
+    share = np.ones(rows)
+    fixed_cost = np.zeros(rows)
+
+    for shop in SHOPS:
+        mask = shops == shop.name
+        if not mask.any():
+            continue
+        # Index of the pricing period in effect on each row's date.
+        starts = np.array([period.effective_from for period in shop.pricing], dtype="U10")
+        period = np.maximum(np.searchsorted(starts, dates[mask], side="right") - 1, 0)
+
+        for metric in shop.metrics:
+            amounts = pd.to_numeric(result[metric.column], errors="coerce").fillna(0).to_numpy(dtype=float)[mask]
+            prices = np.array([p.unit_prices.get(metric.name, 0) for p in shop.pricing], dtype=float)
+            costs = np.array([p.unit_costs.get(metric.name, 0) for p in shop.pricing], dtype=float)
+            revenue[mask] += amounts * prices[period]
+            variable_cost[mask] += amounts * costs[period]
+        share[mask] = np.array([p.revenue_share for p in shop.pricing], dtype=float)[period]
+        fixed_cost[mask] = np.array([p.daily_fixed_cost for p in shop.pricing], dtype=float)[period]
+
+    result["revenue"] = _as_number(revenue)
+    result["cost"] = _as_number(variable_cost + fixed_cost)
+    result["profit"] = _as_number(np.floor(revenue * share) - variable_cost - fixed_cost)
+    return result
+
+
+def profit_series(frame, start_date=None, end_date=None, date_column="date", shop_column="shop"):
+    """
+    Return a tidy (date, shop, profit) DataFrame with one row per shop per day.
+
+    `frame` comes from `add_profit_columns`; rows are grouped by (date, shop)
+    so the fixed cost counts once per day. Days between `start_date` and
+    `end_date` on which a shop recorded nothing get a profit of 0.
+    """
+    daily = frame.assign(**{date_column: pd.to_datetime(frame[date_column])})
+    daily = daily.groupby([date_column, shop_column], as_index=False)["profit"].sum()
+
+    start = pd.Timestamp(start_date) if start_date is not None else daily[date_column].min()
+    end = pd.Timestamp(end_date) if end_date is not None else daily[date_column].max()
+    if pd.isna(start) or pd.isna(end):
+        return pd.DataFrame({"date": pd.Series(dtype="datetime64[ns]"), "shop": pd.Series(dtype=object),
+                             "profit": pd.Series(dtype="int64")})
+    grid = pd.MultiIndex.from_product(
+        [pd.date_range(start, end, freq="D"), [shop.name for shop in SHOPS]],
+        names=[date_column, shop_column],
+    )
+    series = daily.set_index([date_column, shop_column])["profit"].reindex(grid, fill_value=0)
+    return series.reset_index().rename(columns={date_column: "date", shop_column: "shop"})
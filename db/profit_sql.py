@@ -0,0 +1,64 @@
+"""
+The shop registry's pricing (db.shops) rendered as SQL expressions.
+
+`profit_sql` is the SQL form of db.profit_engine.add_profit_columns, used by
+the triggers that maintain daily_shop_summary. It only builds strings, so
+the database layer can import it without numpy or pandas.
+"""
+from db.shops import SHOPS
+
+
+def quote_literal(value):
+    """
+    Return `value` as an SQL string literal, for SQL generated from the registry.
+    """
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _sum_sql(amounts):
+    terms = [f"{column} * {amount}" for column, amount in amounts if amount]
+    return " + ".join(terms) if terms else "0"
+
+
+def _by_period(shop, expression):
+    """
+    Wrap `expression(period)` in a CASE over the shop's pricing periods.
+    """
+    if len(shop.pricing) == 1:
+        return expression(shop.pricing[0])
+    branches = " ".join(
+        f"WHEN date >= {quote_literal(period.effective_from)} THEN {expression(period)}"
+        for period in reversed(shop.pricing[1:])
+    )
+    return f"CASE {branches} ELSE {expression(shop.pricing[0])} END"
+
+
+def profit_sql():
+    """
+    Return {"revenue": sql, "cost": sql, "profit": sql} over the metric columns of one shop-day.
+
+    The expressions refer to `shop`, `date` and the daily_shop_summary metric columns.
+    """
+    def revenue(shop, period):
+        return _sum_sql((metric.column, period.unit_prices.get(metric.name, 0)) for metric in shop.metrics)
+
+    def variable_cost(shop, period):
+        return _sum_sql((metric.column, period.unit_costs.get(metric.name, 0)) for metric in shop.metrics)
+
+    formulas = {
+        "revenue": revenue,
+        "cost": lambda shop, period: f"{variable_cost(shop, period)} + {period.daily_fixed_cost}",
+        # CAST truncates, which is floor() for the non-negative amounts recorded here.
+        "profit": lambda shop, period: (
+            f"CAST(({revenue(shop, period)}) * {period.revenue_share} AS INTEGER)"
+            f" - ({variable_cost(shop, period)}) - {period.daily_fixed_cost}"
+        ),
+    }
+    expressions = {}
+    for name, formula in formulas.items():
+        branches = " ".join(
+            f"WHEN {quote_literal(shop.name)} THEN {_by_period(shop, lambda period, shop=shop: formula(shop, period))}"
+            for shop in SHOPS
+        )
+        expressions[name] = f"CASE shop {branches} ELSE 0 END"
+    return expressions
@@ -0,0 +1,223 @@
+"""
+Process-wide read-through cache for SELECT results.
+
+Entries are keyed on whitespace-normalised SQL plus parameters and carry a
+snapshot of the generation counter of every table the query reads. A
+write to a table bumps its counter, which drops only the entries that
+depend on that table; everything else stays warm. LRU and TTL eviction
+bound memory and staleness from writers outside this process.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+_WHITESPACE = re.compile(r"\s+")
+_READ_TABLES = re.compile(r"\b(?:FROM|JOIN)\s+([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+_WRITE_TABLE = re.compile(
+    r"^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+([A-Za-z_][A-Za-z0-9_]*)",
+    re.IGNORECASE,
+)
+_DDL = re.compile(r"^\s*(?:CREATE|DROP|ALTER)\b", re.IGNORECASE)
+
+
+def normalize_sql(sql):
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def tables_read(sql):
+    """
+    Return the set of tables a SELECT reads, lower-cased.
+    """
+    return {name.lower() for name in _READ_TABLES.findall(sql)}
+
+
+def table_written(sql):
+    """
+    Return the table an INSERT/UPDATE/DELETE writes to, or None.
+    """
+    match = _WRITE_TABLE.match(sql)
+    return match.group(1).lower() if match else None
+
+
+def is_ddl(sql):
+    return bool(_DDL.match(sql))
+
+
+def _freeze(params):
+    if params is None:
+        return ()
+    if isinstance(params, dict):
+        return tuple(sorted(params.items()))
+    return tuple(params)
+
+
+class QueryCache:
+    """
+    LRU/TTL cache of query results with per-table generation counters.
+    """
+
+    def __init__(self, max_entries=512, ttl=300.0, max_rows=50000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._entries = OrderedDict()  # key -> (rows, description, generations, stored_at)
+        self._dependents = {}  # table -> set of keys
+        self._generations = {}
+        self._derived = {}  # table -> tables whose contents are maintained from it
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    # ----------------------------------------------------------------- lookups
+
+    def cacheable(self, sql):
+        """
+        Return the tables of a cacheable SELECT, or None if it must not be cached.
+        """
+        head = sql.lstrip()[:6].upper()
+        if head not in ("SELECT", "WITH"):
+            return None
+        tables = tables_read(sql)
+        if not tables or any(table.startswith("sqlite_") for table in tables):
+            return None
+        return tables
+
+    def key(self, sql, params):
+        return normalize_sql(sql), _freeze(params)
+
+    def snapshot(self, tables):
+        """
+        Return the current generations of `tables`; take it before running the query.
+        """
+        with self._lock:
+            return tuple((table, self._generations.get(table, 0)) for table in sorted(tables))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            rows, description, generations, stored_at = entry
+            if self.ttl and time.monotonic() - stored_at > self.ttl:
+                self._drop_locked(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            if any(self._generations.get(table, 0) != generation for table, generation in generations):
+                self._drop_locked(key)
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return rows, description
+
+    def put(self, key, rows, description, generations):
+        if len(rows) > self.max_rows:
+            return
+        with self._lock:
+            # A write committed while the query ran; the result may already be stale.
+            if any(self._generations.get(table, 0) != generation for table, generation in generations):
+                return
+            if key in self._entries:
+                self._drop_locked(key)
+            self._entries[key] = (rows, description, generations, time.monotonic())
+            for table, _ in generations:
+                self._dependents.setdefault(table, set()).add(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop_locked(oldest)
+                self._stats["evictions"] += 1
+
+    # ------------------------------------------------------------ invalidation
+
+    def add_derived(self, source, *targets):
+        """
+        Declare tables that are rewritten (e.g. by triggers) whenever `source` changes.
+        """
+        with self._lock:
+            self._derived.setdefault(source.lower(), set()).update(target.lower() for target in targets)
+
+    def bump(self, tables):
+        """
+        Advance the generation of `tables` (and their derived tables) and drop dependent entries.
+        """
+        with self._lock:
+            pending = [table.lower() for table in tables]
+            seen = set()
+            while pending:
+                table = pending.pop()
+                if table in seen:
+                    continue
+                seen.add(table)
+                pending.extend(self._derived.get(table, ()))
+                self._generations[table] = self._generations.get(table, 0) + 1
+                for key in list(self._dependents.get(table, ())):
+                    self._drop_locked(key)
+                    self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            for table in list(self._generations):
+                self._generations[table] += 1
+            self._entries.clear()
+            self._dependents.clear()
+
+    def _drop_locked(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for table, _ in entry[2]:
+            keys = self._dependents.get(table)
+            if keys is not None:
+                keys.discard(key)
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["entries"] = len(self._entries)
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_rate"] = snapshot["hits"] / lookups if lookups else 0.0
+        return snapshot
+
+
+class CachedCursor:
+    """
+    Read-only cursor over an already materialised result set.
+    """
+
+    def __init__(self, rows, description):
+        self._rows = rows
+        self._position = 0
+        self.description = description
+        self.rowcount = -1
+        self.lastrowid = None
+
+    def fetchone(self):
+        if self._position >= len(self._rows):
+            return None
+        row = self._rows[self._position]
+        self._position += 1
+        return row
+
+    def fetchmany(self, size=1):
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._rows[self._position:]
+        self._position = len(self._rows)
+        return list(rows)
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def close(self):
+        self._rows = []
@@ -0,0 +1,273 @@
+"""
+Local read replica of the SQLiteCloud database.
+
+With DB_BACKEND=replica every read is served from a local SQLite mirror
+while writes go straight to the primary. A background thread pulls
+changes incrementally using the `change_seq` stamps and the
+`row_deletions` log (migrations 3 and 4), so a sync costs one small query
+per table when nothing changed. After a write is committed the touched
+tables are refreshed immediately, so a session reads its own writes.
+"""
+import datetime
+import logging
+import threading
+import time
+
+from db.daily_summary import ensure_current as ensure_summary_current
+from db.migrations import migrate
+from db.migrations.m0003_change_tracking import TRACKED_TABLES
+from db.pool import is_write
+from db.query_cache import table_written
+
+logger = logging.getLogger(__name__)
+
+_DELETIONS = "__deletions__"
+_START = (-1, 2 ** 63 - 1)  # before any change_seq, including the backfilled 0s
+
+
+class Replica:
+    """
+    Keeps the mirror behind `local_pool` in step with the database behind `primary_pool`.
+    """
+
+    def __init__(self, local_pool, primary_pool, sync_interval=30.0, chunk_size=5000):
+        self.local_pool = local_pool
+        self.primary_pool = primary_pool
+        self.sync_interval = sync_interval
+        self.chunk_size = chunk_size
+
+        self._sync_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._columns = {}
+        self.last_sync_at = None
+        self.last_sync_counts = {}
+        self.last_error = None
+
+    # ------------------------------------------------------------------- setup
+
+    def prepare_mirror(self):
+        """
+        Bring the mirror's schema up to date and drop its change-tracking triggers.
+
+        The mirror keeps the primary's `change_seq` values verbatim, so its own
+        tracking triggers must not restamp them. Derived-data triggers stay.
+        """
+        with self.local_pool.connection() as conn:
+            migrate(conn)
+            ensure_summary_current(conn)
+            triggers = conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg\\_%\\_change\\_seq\\_%' ESCAPE '\\'",
+                use_cache=False,
+            ).fetchall()
+            for trigger in triggers:
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger[0]}")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS replica_state (
+                    name TEXT PRIMARY KEY,
+                    change_seq INTEGER NOT NULL,
+                    row_id INTEGER NOT NULL,
+                    synced_at TEXT NOT NULL
+                )
+            """)
+            conn.commit()
+            for table in TRACKED_TABLES:
+                rows = conn.execute(f"PRAGMA table_info({table})", use_cache=False).fetchall()
+                self._columns[table] = [row[1] for row in rows]
+
+    def start(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._worker = threading.Thread(target=self._run, name="db-replica-sync", daemon=True)
+        self._worker.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.sync()
+            except Exception as e:
+                logger.warning("Replica sync failed: %s", e)
+            self._wakeup.wait(self.sync_interval)
+            self._wakeup.clear()
+
+    # -------------------------------------------------------------------- sync
+
+    def force_refresh(self):
+        """
+        Sync every table now, in the calling thread; return {table: rows applied}.
+        """
+        return self.sync()
+
+    def sync(self, tables=None):
+        """
+        Pull deletions and changed rows of `tables` (default: all) from the primary.
+        """
+        tables = [table for table in TRACKED_TABLES if tables is None or table in tables]
+        with self._sync_lock:
+            try:
+                with self.primary_pool.connection() as remote, self.local_pool.connection() as local:
+                    counts = {"deleted": self._sync_deletions(remote, local)}
+                    for table in tables:
+                        counts[table] = self._sync_table(remote, local, table)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                raise
+            self.last_sync_at = time.time()
+            self.last_sync_counts = counts
+            self.last_error = None
+            return counts
+
+    def _watermark(self, local, name):
+        row = local.execute(
+            "SELECT change_seq, row_id FROM replica_state WHERE name = ?", (name,), use_cache=False
+        ).fetchone()
+        return (row[0], row[1]) if row else _START
+
+    def _save_watermark(self, local, name, watermark):
+        local.execute("""
+            INSERT INTO replica_state (name, change_seq, row_id, synced_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                change_seq = excluded.change_seq, row_id = excluded.row_id, synced_at = excluded.synced_at
+        """, (name, watermark[0], watermark[1], datetime.datetime.now().isoformat(" ", timespec="seconds")))
+
+    def _sync_deletions(self, remote, local):
+        # Deletions are applied before changed rows so a rowid that was deleted
+        # and then reused is re-inserted, not removed.
+        watermark = self._watermark(local, _DELETIONS)[0]
+        applied = 0
+        while True:
+            rows = remote.execute(
+                "SELECT change_seq, table_name, row_id FROM row_deletions WHERE change_seq > ? ORDER BY change_seq LIMIT ?",
+                (watermark, self.chunk_size), use_cache=False,
+            ).fetchall()
+            if not rows:
+                return applied
+            for change_seq, table, row_id in (tuple(row) for row in rows):
+                if table in self._columns:
+                    local.execute(f"DELETE FROM {table} WHERE rowid = ?", (row_id,))
+                watermark = change_seq
+            self._save_watermark(local, _DELETIONS, (watermark, 0))
+            local.commit()
+            applied += len(rows)
+
+    def _sync_table(self, remote, local, table):
+        columns = self._columns[table]
+        column_list = ", ".join(columns)
+        select = (f"SELECT rowid, {column_list} FROM {table} "
+                  f"WHERE (change_seq, rowid) > (?, ?) ORDER BY change_seq, rowid LIMIT ?")
+        update = f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in columns)} WHERE rowid = ?"
+        insert = f"INSERT INTO {table} (rowid, {column_list}) VALUES (?, {', '.join('?' for _ in columns)})"
+        seq_index = columns.index("change_seq") + 1
+
+        watermark = self._watermark(local, table)
+        applied = 0
+        while True:
+            rows = remote.execute(select, watermark + (self.chunk_size,), use_cache=False).fetchall()
+            if not rows:
+                return applied
+            for row in (tuple(row) for row in rows):
+                # UPDATE-then-INSERT (not INSERT OR REPLACE) so delete triggers
+                # that maintain derived tables are never bypassed.
+                if local.execute(update, row[1:] + row[:1]).rowcount == 0:
+                    local.execute(insert, row)
+            watermark = (rows[-1][seq_index], rows[-1][0])
+            self._save_watermark(local, table, watermark)
+            local.commit()
+            applied += len(rows)
+
+    # ------------------------------------------------------------------ status
+
+    def status(self):
+        """
+        Return replica lag and the outcome of the last sync.
+        """
+        age = None if self.last_sync_at is None else time.time() - self.last_sync_at
+        return {
+            "last_sync_at": self.last_sync_at,
+            "lag_seconds": age,
+            "last_sync_counts": self.last_sync_counts,
+            "last_error": self.last_error,
+            "sync_interval": self.sync_interval,
+        }
+
+
+class ReplicaConnection:
+    """
+    Connection facade that reads from the mirror and writes to the primary.
+
+    Once this connection has an uncommitted write, reads go to the primary
+    as well so the transaction sees its own changes.
+    """
+
+    def __init__(self, replica):
+        self._replica = replica
+        self._local = replica.local_pool.connection()
+        self._primary = None
+        self._written = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self._primary is not None:
+                self._primary.__exit__(exc_type, exc, tb)
+        finally:
+            self._local.__exit__(exc_type, exc, tb)
+        return False
+
+    def _primary_connection(self):
+        if self._primary is None:
+            self._primary = self._replica.primary_pool.connection()
+        return self._primary
+
+    def _in_write_transaction(self):
+        return self._primary is not None and self._primary._dirty
+
+    def execute(self, sql, parameters=(), use_cache=True):
+        if is_write(sql):
+            self._note_write(sql)
+            return self._primary_connection().execute(sql, parameters)
+        if self._in_write_transaction():
+            return self._primary.execute(sql, parameters, use_cache=False)
+        return self._local.execute(sql, parameters, use_cache=use_cache)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._note_write(sql)
+        return self._primary_connection().executemany(sql, seq_of_parameters)
+
+    def _note_write(self, sql):
+        table = table_written(sql)
+        if table:
+            self._written.add(table)
+
+    def commit(self):
+        if self._primary is None:
+            return
+        self._primary.commit()
+        written, self._written = self._written, set()
+        if written:
+            try:
+                self._replica.sync(written)
+            except Exception as e:
+                # The background sync will catch up once the primary is reachable.
+                logger.warning("Replica refresh after commit failed: %s", e)
+
+    def rollback(self):
+        if self._primary is not None:
+            self._primary.rollback()
+        self._written.clear()
+
+    def ping(self):
+        """
+        Return True if the primary answers; the mirror is always reachable.
+        """
+        return self._primary_connection().ping()
+
+    def close(self):
+        """
+        Pooled connections are closed by their pools; closing this facade is a no-op.
+        """
+
+    def __getattr__(self, name):
+        return getattr(self._local, name)
@@ -0,0 +1,110 @@
+"""
+One query builder for every shop report.
+
+A `Report` declares the shop, the series it charts, the grain (day, week or
+month) and any derived series, and generates a single parameterized query
+against the pre-pivoted tables: `daily_shop_summary` for days and the
+weekly/monthly rollups for longer grains (see db.daily_summary). Only the
+requested columns are selected, and the WHERE clause seeks the tables'
+(shop, date) / (shop, period) primary keys.
+
+    report = Report("Barber Shop", {"adult_haircuts": "Adult Haircuts", "profit": "Profit"})
+    df = report.fetch(start_date, end_date)
+
+`query()` returns (sql, params) so reports can also go through
+`run_queries` alongside other statements, then `frame(rows)` types the result.
+"""
+import pandas as pd
+
+from db.daily_summary import ROLLUPS, VALUE_COLUMNS
+from db.database import get_connection
+
+# Grain -> (table, period key column, period label in SQL, period key of a date parameter).
+# Rollup periods are calendar integer keys; a date maps to its key through the calendar.
+GRAINS = {
+    "day": ("daily_shop_summary", "date", "date", "?"),
+    "week": (
+        "weekly_shop_rollup", "period", "printf('%04d-W%02d', period / 100, period % 100)",
+        f"(SELECT {ROLLUPS['weekly_shop_rollup']} FROM calendar WHERE date = ?)",
+    ),
+    "month": (
+        "monthly_shop_rollup", "period", "printf('%04d-%02d', period / 100, period % 100)",
+        f"(SELECT {ROLLUPS['monthly_shop_rollup']} FROM calendar WHERE date = ?)",
+    ),
+}
+
+
+class Report:
+    """
+    Declarative description of a shop report.
+
+    `series` maps summary columns (metric columns, revenue, cost, profit) to
+    their labels; `derived` maps further labels to SQL expressions over
+    those columns, e.g. {"Margin %": "100.0 * profit / NULLIF(revenue, 0)"}.
+    On weekly and monthly grains derived series are computed from the
+    period totals, so ratios stay correct.
+    """
+
+    def __init__(self, shop, series, grain="day", derived=None):
+        if grain not in GRAINS:
+            raise ValueError(f"Unknown grain {grain!r}; expected one of {', '.join(GRAINS)}")
+        unknown = [column for column in series if column not in VALUE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown report columns: {', '.join(unknown)}")
+        self.shop = shop
+        self.series = dict(series)
+        self.grain = grain
+        self.derived = dict(derived or {})
+
+    @property
+    def period_label(self):
+        return "Date" if self.grain == "day" else "Period"
+
+    @property
+    def labels(self):
+        return [self.period_label, *self.series.values(), *self.derived]
+
+    def query(self, start_date=None, end_date=None):
+        """
+        Return (sql, params) fetching the report's rows between two dates (inclusive).
+        """
+        table, period, label, key = GRAINS[self.grain]
+        columns = [label, *self.series, *self.derived.values()]
+        conditions, params = ["shop = ?"], [self.shop]
+        if start_date is not None:
+            conditions.append(f"{period} >= {key}")
+            params.append(str(start_date))
+        if end_date is not None:
+            conditions.append(f"{period} <= {key}")
+            params.append(str(end_date))
+        sql = f"""
+            SELECT {", ".join(columns)}
+            FROM {table}
+            WHERE {" AND ".join(conditions)}
+            ORDER BY {period}
+        """
+        return sql, tuple(params)
+
+    def frame(self, rows):
+        """
+        Return `rows` of `query()` as a DataFrame with the report's labels as columns.
+
+        Dates are datetime64, series are nullable integers and derived series floats.
+        """
+        df = pd.DataFrame([tuple(row) for row in rows], columns=self.labels)
+        if self.grain == "day":
+            df["Date"] = pd.to_datetime(df["Date"])
+        for label in self.series.values():
+            df[label] = df[label].astype("Int64")
+        for label in self.derived:
+            df[label] = pd.to_numeric(df[label], errors="coerce").astype("float64")
+        return df
+
+    def fetch(self, start_date=None, end_date=None):
+        """
+        Run the report's query and return its DataFrame.
+        """
+        sql, params = self.query(start_date, end_date)
+        with get_connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return self.frame(rows)
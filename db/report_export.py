@@ -0,0 +1,104 @@
+"""
+Streaming CSV/XLSX export of report queries.
+
+Rows are read from the cursor `EXPORT_CHUNK_SIZE` at a time and written
+straight to a spooled temporary file (in memory while small, on disk past
+EXPORT_SPOOL_BYTES), so exporting a multi-year range never holds the
+result set or a DataFrame of it in memory. `export_query` hands back that
+file; `export_bytes` reads it out for st.download_button, which the pages
+only call when a download is clicked.
+
+XLSX needs openpyxl (optional); its write-only workbook streams rows to
+disk as well. `export_formats()` lists what is available.
+"""
+import csv
+import io
+import tempfile
+
+from db.database import get_connection
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+# Format -> (file extension, MIME type)
+FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "XLSX": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def export_formats():
+    """
+    Return the export formats usable here; XLSX only when openpyxl is installed.
+    """
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        return ["CSV"]
+    return ["CSV", "XLSX"]
+
+
+def iter_query_chunks(sql, params=(), chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the rows of a query as lists of tuples, `chunk_size` rows at a time.
+    """
+    with get_connection() as conn:
+        cursor = conn.execute(sql, params, use_cache=False)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield [tuple(row) for row in rows]
+
+
+def write_csv(out, header, chunks):
+    # utf-8-sig so Excel opens the baht sign and Thai text correctly
+    text = io.TextIOWrapper(out, encoding="utf-8-sig", newline="")
+    writer = csv.writer(text)
+    writer.writerow(header)
+    for rows in chunks:
+        writer.writerows(rows)
+    text.flush()
+    text.detach()
+
+
+def write_xlsx(out, header, chunks, sheet_name="Report"):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_name[:31])
+    sheet.append(list(header))
+    for rows in chunks:
+        for row in rows:
+            sheet.append(row)
+    workbook.save(out)
+
+
+WRITERS = {"CSV": write_csv, "XLSX": write_xlsx}
+
+
+def export_query(sql, params, header, fmt="CSV", chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Run `sql` and write its rows, under `header`, as CSV or XLSX to a temporary file.
+
+    Returns the file rewound to the start; the caller closes it (it is a
+    context manager).
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(WRITERS)}")
+    out = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+    try:
+        WRITERS[fmt](out, header, iter_query_chunks(sql, params, chunk_size))
+    except Exception:
+        out.close()
+        raise
+    out.seek(0)
+    return out
+
+
+def export_bytes(sql, params, header, fmt="CSV", chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Return `export_query`'s file contents as bytes, the form st.download_button serves.
+    """
+    with export_query(sql, params, header, fmt, chunk_size) as out:
+        return out.read()
@@ -0,0 +1,126 @@
+"""
+SQL used by the report pages.
+
+Kept in one place so the statements can be checked against the indexes
+from the migrations: run `python -m db.report_queries` to print the
+EXPLAIN QUERY PLAN of every report query. Per-shop report queries are
+generated by db.report_builder; a sample of each grain is explained too.
+"""
+import datetime
+
+from db.profit_sql import quote_literal
+from db.shops import SHOP_METRICS
+
+# The registry's shops as an SQL list, for `shop IN (...)`
+_SHOP_LIST = ", ".join(quote_literal(shop) for shop in SHOP_METRICS)
+
+
+# Every shop's entries over a date range, for the entry grid. Listing the
+# shops lets SQLite seek idx_daily_entries_shop_date once per shop.
+ENTRIES_BETWEEN = f"""
+    SELECT date, shop, metric, value
+    FROM daily_entries
+    WHERE shop IN ({_SHOP_LIST}) AND date BETWEEN ? AND ?
+"""
+
+# Per-shop totals over a date range: one row per shop.
+PROFIT_TOTALS_BETWEEN = f"""
+    SELECT shop, SUM(revenue) AS revenue, SUM(cost) AS cost, SUM(profit) AS profit, COUNT(*) AS days
+    FROM daily_shop_summary
+    WHERE shop IN ({_SHOP_LIST}) AND date BETWEEN ? AND ?
+    GROUP BY shop
+"""
+
+# Daily profit of every shop over a date range, for the profit line chart.
+DAILY_PROFIT_BETWEEN = f"""
+    SELECT date, shop, profit
+    FROM daily_shop_summary
+    WHERE shop IN ({_SHOP_LIST}) AND date BETWEEN ? AND ?
+"""
+
+# Weekly profit and revenue of one shop next to the start-of-week inventory
+# value. Both sides are keyed on the ISO week key (year * 100 + week), so they
+# join on integers and agree on week numbering (idx_weekly_inventory_iso_week).
+WEEKLY_PROFIT_VS_INVENTORY = """
+    WITH inventory AS (
+        SELECT wi.iso_week_key AS week_key, SUM(wi.quantity * ii.cost) AS inventory_cost
+        FROM weekly_inventory wi
+        JOIN inventory_items ii ON wi.item_id = ii.id
+        WHERE wi.inventory_type = 'start'
+        GROUP BY wi.iso_week_key
+    ),
+    weeks AS (
+        SELECT period AS week_key FROM weekly_shop_rollup WHERE shop = ?
+        UNION
+        SELECT week_key FROM inventory
+    )
+    SELECT printf('%04d-W%02d', weeks.week_key / 100, weeks.week_key % 100) AS week,
+           COALESCE(r.profit, 0) AS profit, COALESCE(r.revenue, 0) AS revenue,
+           COALESCE(i.inventory_cost, 0) AS inventory_cost
+    FROM weeks
+    LEFT JOIN weekly_shop_rollup r ON r.shop = ? AND r.period = weeks.week_key
+    LEFT JOIN inventory i ON i.week_key = weeks.week_key
+    ORDER BY weeks.week_key
+"""
+
+# Usage and cost per item over one ISO week key, joining its start and end
+# counts in SQL instead of matching the two lists in Python
+# (idx_weekly_inventory_iso_week).
+WEEKLY_INVENTORY_USAGE = """
+    SELECT ii.name, s.quantity - e.quantity AS amount_used, ii.cost,
+           CAST((s.quantity - e.quantity) * ii.cost AS INTEGER) AS total_cost
+    FROM weekly_inventory s
+    JOIN weekly_inventory e
+      ON e.iso_week_key = s.iso_week_key AND e.inventory_type = 'end' AND e.item_id = s.item_id
+    JOIN inventory_items ii ON ii.id = s.item_id
+    WHERE s.iso_week_key = ? AND s.inventory_type = 'start'
+    ORDER BY ii.name
+"""
+
+# Which weeks have their start and end inventory counted (idx_weekly_tracking_iso_week).
+WEEKLY_TRACKING_STATUS = """
+    SELECT iso_week_key, week_number, year, start_inventory, end_inventory
+    FROM weekly_tracking
+    ORDER BY iso_week_key
+"""
+
+
+def _sample_queries():
+    from db.report_builder import Report
+
+    today = datetime.date.today().isoformat()
+    year, week, _ = datetime.date.today().isocalendar()
+    return {
+        "ENTRIES_BETWEEN": (ENTRIES_BETWEEN, (today, today)),
+        "PROFIT_TOTALS_BETWEEN": (PROFIT_TOTALS_BETWEEN, (today, today)),
+        "DAILY_PROFIT_BETWEEN": (DAILY_PROFIT_BETWEEN, (today, today)),
+        # Shop reports are generated by db.report_builder
+        "Report (day)": Report("Barber Shop", {"adult_haircuts": "Adult Haircuts", "profit": "Profit"}).query(today, today),
+        "Report (week)": Report("Meatball Stand", {"profit": "Profit"}, grain="week").query(today, today),
+        "Report (month)": Report("Meatball Stand", {"sales": "Sales"}, grain="month").query(),
+        "WEEKLY_PROFIT_VS_INVENTORY": (WEEKLY_PROFIT_VS_INVENTORY, ("Meatball Stand", "Meatball Stand")),
+        "WEEKLY_INVENTORY_USAGE": (WEEKLY_INVENTORY_USAGE, (year * 100 + week,)),
+        "WEEKLY_TRACKING_STATUS": (WEEKLY_TRACKING_STATUS, ()),
+    }
+
+
+def explain_report_queries(conn):
+    """
+    Return {query name: [plan detail lines]} for every report query.
+    """
+    plans = {}
+    for name, (sql, params) in _sample_queries().items():
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        plans[name] = [row[-1] for row in rows]
+    return plans
+
+
+if __name__ == "__main__":
+    from db.database import get_connection, setup_database
+
+    setup_database()
+    with get_connection() as conn:
+        for name, details in explain_report_queries(conn).items():
+            print(name)
+            for detail in details:
+                print(f"    {detail}")
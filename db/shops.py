@@ -0,0 +1,160 @@
+"""
+Registry of shops, the daily metrics recorded for each of them and their pricing.
+
+The registry is read from SHOPS_CONFIG (default db/shops.json). Each shop
+lists its metrics and one or more pricing periods, each effective from a
+date until the next one starts:
+
+- unit_prices: baht earned per unit of a metric (revenue)
+- unit_costs: baht spent per unit of a metric (variable cost)
+- revenue_share: the part of the revenue the business keeps
+- daily_fixed_cost: baht charged against every day the shop has entries
+
+so that a day's profit is
+
+    floor(revenue * revenue_share) - variable cost - daily_fixed_cost
+
+Adding a shop or changing a price only needs an edit to the config file;
+see db.profit_engine for the code that evaluates it.
+"""
+import bisect
+import datetime
+import json
+import numbers
+import os
+import re
+
+SHOPS_CONFIG_PATH = os.environ.get("SHOPS_CONFIG", os.path.join(os.path.dirname(__file__), "shops.json"))
+
+# Metric columns become daily_shop_summary / rollup columns in DDL and triggers.
+COLUMN_PATTERN = re.compile(r"^[a-z_][a-z0-9_]*$")
+# Columns the summary and rollup tables already have
+RESERVED_COLUMNS = {"date", "shop", "revenue", "cost", "profit", "period", "days"}
+
+
+class Metric:
+    """
+    One daily metric of a shop, e.g. "Adult Haircuts".
+    """
+
+    def __init__(self, name, column, label=None):
+        self.name = name
+        self.column = column
+        self.label = label or name
+
+
+class PricePeriod:
+    """
+    Prices and costs of a shop from `effective_from` until the next period.
+    """
+
+    def __init__(self, effective_from, unit_prices, unit_costs=None, revenue_share=1, daily_fixed_cost=0):
+        self.effective_from = effective_from
+        self.unit_prices = dict(unit_prices)
+        self.unit_costs = dict(unit_costs or {})
+        self.revenue_share = revenue_share
+        self.daily_fixed_cost = daily_fixed_cost
+
+
+class Shop:
+    """
+    A shop, its metrics and its pricing history.
+    """
+
+    def __init__(self, name, metrics, pricing, color=None):
+        self.name = name
+        self.metrics = metrics
+        self.pricing = sorted(pricing, key=lambda period: period.effective_from)
+        self.color = color
+
+    @property
+    def metric_names(self):
+        return [metric.name for metric in self.metrics]
+
+    @property
+    def columns(self):
+        """
+        {metric name: daily_shop_summary column}
+        """
+        return {metric.name: metric.column for metric in self.metrics}
+
+    def pricing_on(self, date):
+        """
+        Return the PricePeriod in effect on `date` (the first one for earlier dates).
+        """
+        starts = [period.effective_from for period in self.pricing]
+        index = bisect.bisect_right(starts, str(date)[:10]) - 1
+        return self.pricing[max(index, 0)]
+
+
+def _check_period(path, name, period):
+    """
+    Prices end up in trigger SQL (db.profit_sql), so only accept dates and plain numbers.
+    """
+    try:
+        datetime.date.fromisoformat(period.effective_from)
+    except (TypeError, ValueError):
+        raise ValueError(f"{path}: {name} pricing has an invalid effective_from {period.effective_from!r}.")
+    amounts = [*period.unit_prices.values(), *period.unit_costs.values(),
+               period.revenue_share, period.daily_fixed_cost]
+    if not all(isinstance(amount, numbers.Real) and not isinstance(amount, bool) for amount in amounts):
+        raise ValueError(f"{path}: {name} pricing from {period.effective_from} must use plain numbers.")
+
+
+def load_registry(path=SHOPS_CONFIG_PATH):
+    """
+    Read and validate the shop registry; return the shops in config order.
+    """
+    with open(path, encoding="utf-8") as config_file:
+        config = json.load(config_file)
+
+    shops, columns = [], set()
+    for entry in config["shops"]:
+        name = entry["name"]
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError(f"{path}: every shop needs a name.")
+        metrics = [Metric(metric["name"], metric["column"], metric.get("label")) for metric in entry["metrics"]]
+        names = {metric.name for metric in metrics}
+        for metric in metrics:
+            if not isinstance(metric.column, str) or not COLUMN_PATTERN.match(metric.column):
+                raise ValueError(f"{path}: column '{metric.column}' of {name} must match {COLUMN_PATTERN.pattern}.")
+            if metric.column in RESERVED_COLUMNS:
+                raise ValueError(f"{path}: column '{metric.column}' of {name} is reserved by the summary tables.")
+            if metric.column in columns:
+                raise ValueError(f"{path}: column '{metric.column}' of {name} is used by another metric.")
+            columns.add(metric.column)
+
+        if not entry.get("pricing"):
+            raise ValueError(f"{path}: {name} has no pricing.")
+        pricing = [
+            PricePeriod(
+                period["effective_from"],
+                period.get("unit_prices", {}),
+                period.get("unit_costs", {}),
+                period.get("revenue_share", 1),
+                period.get("daily_fixed_cost", 0),
+            )
+            for period in entry["pricing"]
+        ]
+        for period in pricing:
+            _check_period(path, name, period)
+            unknown = (set(period.unit_prices) | set(period.unit_costs)) - names
+            if unknown:
+                raise ValueError(f"{path}: {name} pricing from {period.effective_from} "
+                                 f"refers to unknown metrics {sorted(unknown)}.")
+        shops.append(Shop(name, metrics, pricing, entry.get("color")))
+    return shops
+
+
+SHOPS = load_registry()
+SHOPS_BY_NAME = {shop.name: shop for shop in SHOPS}
+
+# Shop name -> metric names, in entry order
+SHOP_METRICS = {shop.name: shop.metric_names for shop in SHOPS}
+
+# daily_shop_summary metric columns, one per (shop, metric)
+METRIC_COLUMNS = [metric.column for shop in SHOPS for metric in shop.metrics]
+
+
+def get_shop(name):
+    return SHOPS_BY_NAME[name]
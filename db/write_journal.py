@@ -0,0 +1,282 @@
+"""
+Durable local write journal with a background flusher.
+
+Saves from the entry forms are appended to an fsync'ed JSON-lines file on
+local disk and confirmed immediately. A daemon thread drains the journal
+into the database in batched transactions, retrying with exponential
+backoff while the database is unreachable. Every journaled statement is an
+upsert keyed on a UNIQUE constraint, so replaying a batch after a crash
+between commit and checkpoint is harmless.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_DIR = os.environ.get("DB_JOURNAL_DIR", os.path.join("data", "journal"))
+
+
+class WriteJournal:
+    """
+    Append-only journal of write batches plus the worker that flushes it.
+
+    A record is a list of (sql, rows) statements that are applied together
+    in one transaction. `journal.jsonl` holds the records, `journal.offset`
+    the byte offset of the first record not yet committed, and
+    `journal.rejected.jsonl` records the database refused outright.
+    """
+
+    def __init__(self, directory, connection_factory, batch_size=50,
+                 initial_backoff=1.0, max_backoff=60.0, max_attempts=5):
+        self.directory = directory
+        self._connection_factory = connection_factory
+        self.batch_size = batch_size
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+
+        os.makedirs(directory, exist_ok=True)
+        self._path = os.path.join(directory, "journal.jsonl")
+        self._offset_path = os.path.join(directory, "journal.offset")
+        self._rejected_path = os.path.join(directory, "journal.rejected.jsonl")
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._drained = threading.Condition(self._lock)
+        self._worker = None
+        self._stopping = False
+        self._head_attempts = 0
+        self.last_error = None
+
+        self._recover()
+
+    # ------------------------------------------------------------------ writing
+
+    def append(self, statements):
+        """
+        Durably journal a batch of (sql, rows) statements and return its id.
+        """
+        record = {
+            "id": uuid.uuid4().hex,
+            "created_at": time.time(),
+            "statements": [{"sql": sql, "rows": [list(row) for row in rows]} for sql, rows in statements],
+        }
+        line = json.dumps(record, default=str, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self._path, "a", encoding="utf-8") as journal:
+                journal.write(line)
+                journal.flush()
+                os.fsync(journal.fileno())
+        self.start()
+        self._wakeup.set()
+        return record["id"]
+
+    def pending(self):
+        """
+        Return the number of journaled records not yet committed to the database.
+        """
+        with self._lock:
+            return len(self._read_pending(self._read_offset(), limit=None))
+
+    def rejected(self):
+        """
+        Return the number of records the database refused and that were set aside.
+        """
+        if not os.path.exists(self._rejected_path):
+            return 0
+        with open(self._rejected_path, encoding="utf-8") as rejected:
+            return sum(1 for _ in rejected)
+
+    def flush(self, timeout=None):
+        """
+        Block until the journal is drained (or `timeout` seconds pass); return True if drained.
+        """
+        self.start()
+        self._wakeup.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._drained:
+            while self._read_pending(self._read_offset(), limit=1):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._drained.wait(remaining)
+        return True
+
+    # ------------------------------------------------------------------- worker
+
+    def start(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._stopping = False
+                self._worker = threading.Thread(target=self._run, name="db-write-journal", daemon=True)
+                self._worker.start()
+
+    def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+
+    def _run(self):
+        backoff = self.initial_backoff
+        while not self._stopping:
+            try:
+                flushed = self._flush_batch()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning("Write journal flush failed, retrying in %.0fs: %s", backoff, e)
+                self._wakeup.wait(backoff)
+                self._wakeup.clear()
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+
+            backoff = self.initial_backoff
+            if not flushed:
+                self._wakeup.wait(30)
+                self._wakeup.clear()
+
+    def _flush_batch(self):
+        """
+        Commit up to `batch_size` pending records in one transaction; return how many.
+        """
+        with self._lock:
+            offset = self._read_offset()
+            batch = self._read_pending(offset, limit=self.batch_size)
+        if not batch:
+            return 0
+
+        try:
+            with self._connection_factory() as conn:
+                for record, _ in batch:
+                    self._apply(conn, record)
+                conn.commit()
+        except Exception:
+            if len(batch) == 1 and self._database_reachable():
+                # The database is up but refuses this record: after a few tries
+                # set it aside rather than block every later save behind it.
+                self._head_attempts += 1
+                if self._head_attempts >= self.max_attempts:
+                    self._reject(batch[0][0], batch[0][1])
+                    return 1
+            elif len(batch) > 1 and self._database_reachable():
+                # Isolate the failing record by retrying one at a time.
+                self.batch_size, original = 1, self.batch_size
+                try:
+                    return self._flush_batch()
+                finally:
+                    self.batch_size = original
+            raise
+
+        self._head_attempts = 0
+        self.last_error = None
+        self._advance(batch[-1][1])
+        return len(batch)
+
+    @staticmethod
+    def _apply(conn, record):
+        for statement in record["statements"]:
+            rows = [tuple(row) for row in statement["rows"]]
+            if len(rows) == 1:
+                conn.execute(statement["sql"], rows[0])
+            else:
+                conn.executemany(statement["sql"], rows)
+
+    def _database_reachable(self):
+        try:
+            with self._connection_factory() as conn:
+                return conn.ping()
+        except Exception:
+            return False
+
+    def _reject(self, record, end_offset):
+        logger.error("Write journal record %s rejected by the database; moved to %s", record["id"], self._rejected_path)
+        with self._lock:
+            with open(self._rejected_path, "a", encoding="utf-8") as rejected:
+                rejected.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._head_attempts = 0
+        self._advance(end_offset)
+
+    # ------------------------------------------------------------ file handling
+
+    def _read_offset(self):
+        try:
+            with open(self._offset_path, encoding="utf-8") as offset_file:
+                return int(offset_file.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _write_offset(self, offset):
+        temp_path = self._offset_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as offset_file:
+            offset_file.write(str(offset))
+            offset_file.flush()
+            os.fsync(offset_file.fileno())
+        os.replace(temp_path, self._offset_path)
+
+    def _read_pending(self, offset, limit):
+        """
+        Return [(record, end_offset)] for records after `offset`.
+        """
+        if not os.path.exists(self._path):
+            return []
+        records = []
+        with open(self._path, "rb") as journal:
+            journal.seek(offset)
+            for line in journal:
+                offset += len(line)
+                if not line.strip():
+                    continue
+                records.append((json.loads(line), offset))
+                if limit is not None and len(records) >= limit:
+                    break
+        return records
+
+    def _advance(self, offset):
+        with self._lock:
+            if offset >= os.path.getsize(self._path):
+                # Fully drained: start a fresh file so the journal never grows unbounded.
+                open(self._path, "w").close()
+                offset = 0
+            self._write_offset(offset)
+            self._drained.notify_all()
+
+    def _recover(self):
+        """
+        Drop a torn last line left by a crash in the middle of an append.
+        """
+        if not os.path.exists(self._path):
+            return
+        with open(self._path, "rb+") as journal:
+            data = journal.read()
+            if data and not data.endswith(b"\n"):
+                journal.truncate(data.rfind(b"\n") + 1)
+
+
+_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_journal():
+    """
+    Return the process-wide write journal, starting its flusher on first use.
+    """
+    global _journal
+    if _journal is None:
+        with _journal_lock:
+            if _journal is None:
+                from db.database import get_connection
+
+                _journal = WriteJournal(JOURNAL_DIR, get_connection)
+                _journal.start()
+    return _journal
+
+
+def journal_write(statements):
+    """
+    Journal a batch of (sql, rows) statements to be applied in one transaction.
+    """
+    return get_journal().append(statements)
@@ -0,0 +1,39 @@
+"""
+Idempotent write statements used by the entry forms.
+
+Each one is an upsert keyed on a UNIQUE constraint, so it can be replayed
+from the write journal any number of times with the same result.
+"""
+
+# daily_entries: UNIQUE(date, shop, metric). Re-saving an unchanged value
+# leaves the row (and its change_seq) untouched.
+UPSERT_DAILY_ENTRY = """
+    INSERT INTO daily_entries (date, shop, metric, value)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(date, shop, metric)
+    DO UPDATE SET value = excluded.value
+    WHERE daily_entries.value IS NOT excluded.value
+"""
+
+# weekly_inventory: UNIQUE(item_id, inventory_type, week_number, year)
+UPSERT_WEEKLY_INVENTORY = """
+    INSERT INTO weekly_inventory (item_id, inventory_type, quantity, record_date, week_number, year)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (item_id, inventory_type, week_number, year)
+    DO UPDATE SET quantity = excluded.quantity, record_date = excluded.record_date
+"""
+
+# weekly_tracking: UNIQUE(week_number, year)
+MARK_WEEK_START_COUNTED = """
+    INSERT INTO weekly_tracking (week_number, year, start_inventory)
+    VALUES (?, ?, 1)
+    ON CONFLICT (week_number, year)
+    DO UPDATE SET start_inventory = 1
+"""
+
+MARK_WEEK_END_COUNTED = """
+    INSERT INTO weekly_tracking (week_number, year, end_inventory)
+    VALUES (?, ?, 1)
+    ON CONFLICT (week_number, year)
+    DO UPDATE SET end_inventory = 1
+"""
@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import database
+from db.backends import LocalSQLiteBackend
+
+
+@pytest.fixture
+def empty_db(tmp_path, monkeypatch):
+    """
+    Point the app at a new, empty local SQLite file.
+    """
+    monkeypatch.setattr(database, "_backend", LocalSQLiteBackend(str(tmp_path / "test.db")))
+    monkeypatch.setattr(database, "_pool", None)
+    monkeypatch.setattr(database, "_replica", None)
+    monkeypatch.setattr(database, "_schema_ready", False)
+    yield database
+    if database._pool is not None:
+        database._pool.close()
+
+
+@pytest.fixture
+def local_db(empty_db):
+    """
+    Point the app at a new local SQLite file with the current schema.
+    """
+    empty_db.setup_database()
+    return empty_db
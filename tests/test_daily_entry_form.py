@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest
+
+from db import daily_entry_repository
+from db.shops import get_shop
+
+FORM_SCRIPT = """
+from components.daily_entry_form import display_daily_entry_form
+from db.shops import get_shop
+
+display_daily_entry_form(get_shop("Barber Shop"))
+"""
+
+
+def _save(at, values):
+    for number_input, value in zip(at.number_input, values):
+        number_input.set_value(value)
+    at.button[0].click().run()
+    assert not at.exception
+    return at.success[0].value
+
+
+def test_form_writes_through_repository_and_reports_counts(local_db):
+    shop = get_shop("Barber Shop")
+    at = AppTest.from_string(FORM_SCRIPT).run()
+    assert len(at.number_input) == len(shop.metrics)
+
+    first = _save(at, [2] * len(shop.metrics))
+    assert f"({len(shop.metrics)} new, 0 updated, 0 unchanged)" in first
+    with local_db.get_connection() as conn:
+        saved = conn.execute("SELECT COUNT(*) FROM daily_entries WHERE shop = ?", (shop.name,)).fetchone()[0]
+    assert saved == len(shop.metrics)
+
+    second = _save(at, [3] + [2] * (len(shop.metrics) - 1))
+    assert f"(0 new, 1 updated, {len(shop.metrics) - 1} unchanged)" in second
+
+
+def test_save_journals_only_when_database_unreachable(local_db, monkeypatch):
+    journaled = []
+
+    def unreachable(self, entries):
+        raise ConnectionError("database down")
+
+    monkeypatch.setattr(daily_entry_repository.DailyEntryRepository, "bulk_upsert", unreachable)
+    monkeypatch.setattr(daily_entry_repository, "_journal_daily_entries", journaled.append)
+    entry = ("2025-03-03", "Barber Shop", "Adult Haircuts", 3)
+
+    # The database still answers, so the error is the caller's to see.
+    with pytest.raises(ConnectionError):
+        daily_entry_repository.save_daily_entries([entry])
+    assert journaled == []
+
+    monkeypatch.setattr(daily_entry_repository, "_database_reachable", lambda: False)
+    assert daily_entry_repository.save_daily_entries([entry]) is None
+    assert journaled == [[entry]]
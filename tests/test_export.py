@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from db.daily_entry_repository import DailyEntryRepository
+from db.export import export_database
+
+
+def _seed_inventory(database):
+    with database.get_connection() as conn:
+        item_id = conn.execute(
+            "INSERT INTO inventory_items (name, cost, quantity) VALUES ('Meatballs', 5, 10)"
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO weekly_inventory (item_id, inventory_type, quantity, record_date, week_number, year) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (item_id, "start", 10, "2024-12-30", 1, 2025),
+                (item_id, "end", 4, "2025-01-05", 1, 2025),
+                (item_id, "start", 8, "2024-01-01", 1, 2024),
+            ],
+        )
+        conn.commit()
+
+
+def test_exported_directories_read_back(local_db, tmp_path):
+    DailyEntryRepository().bulk_upsert([
+        ("2025-03-03", "Barber Shop", "Adult Haircuts", 3),
+        ("2025-04-01", "Barber Shop", "Adult Haircuts", 5),
+    ])
+    _seed_inventory(local_db)
+    out = str(tmp_path / "snapshot")
+
+    counts = export_database(out)
+    assert counts["daily_entries"] == 2
+    assert counts["weekly_inventory"] == 3
+
+    inventory = pq.read_table(os.path.join(out, "weekly_inventory")).to_pylist()
+    assert sorted((row["year"], row["iso_year"], row["inventory_type"]) for row in inventory) == [
+        (2024, 2024, "start"), (2025, 2025, "end"), (2025, 2025, "start"),
+    ]
+
+    entries = pq.read_table(os.path.join(out, "daily_entries")).to_pylist()
+    assert sorted((row["date"], row["value"], row["month"]) for row in entries) == [
+        ("2025-03-03", 3, 3), ("2025-04-01", 5, 4),
+    ]
+
+
+def test_incremental_export_reads_back(local_db, tmp_path):
+    _seed_inventory(local_db)
+    out = str(tmp_path / "snapshot")
+    export_database(out)
+
+    with local_db.get_connection() as conn:
+        conn.execute("UPDATE weekly_inventory SET quantity = 6 WHERE inventory_type = 'end'")
+        conn.commit()
+    counts = export_database(out, incremental=True)
+    assert counts["weekly_inventory"] == 1
+
+    rows = pq.read_table(os.path.join(out, "weekly_inventory")).to_pylist()
+    latest = {}
+    for row in sorted(rows, key=lambda row: row["change_seq"]):
+        latest[row["_rowid"]] = row
+    assert sorted(row["quantity"] for row in latest.values()) == [6, 8, 10]
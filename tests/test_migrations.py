@@ -0,0 +1,39 @@
+from db import migrations
+from db.migrations import load_migrations, migrate
+
+
+def _migrate_to(conn, monkeypatch, version):
+    shipped = load_migrations()
+    with monkeypatch.context() as patch:
+        patch.setattr(migrations, "load_migrations", lambda: [m for m in shipped if m[0] <= version])
+        migrate(conn)
+
+
+def test_iso_week_move_logs_the_replaced_count(empty_db, monkeypatch):
+    with empty_db.get_connection() as conn:
+        _migrate_to(conn, monkeypatch, 7)
+        item_id = conn.execute("INSERT INTO inventory_items (name, cost) VALUES ('Meatballs', 5)").lastrowid
+        # 2024-12-30 is ISO 2025-W01 but was stored under the calendar year,
+        # next to a count already keyed 2025-W01 for the same item and type.
+        stale_id = conn.execute(
+            "INSERT INTO weekly_inventory (item_id, inventory_type, quantity, record_date, week_number, year) "
+            "VALUES (?, 'start', 12, '2024-12-30', 1, 2024)", (item_id,)
+        ).lastrowid
+        replaced_id = conn.execute(
+            "INSERT INTO weekly_inventory (item_id, inventory_type, quantity, record_date, week_number, year) "
+            "VALUES (?, 'start', 10, '2025-01-01', 1, 2025)", (item_id,)
+        ).lastrowid
+        conn.commit()
+
+        migrate(conn)
+
+        rows = conn.execute(
+            "SELECT id, week_number, year, quantity, iso_week_key FROM weekly_inventory", use_cache=False
+        ).fetchall()
+        assert [tuple(row) for row in rows] == [(stale_id, 1, 2025, 12, 202501)]
+        deletions = conn.execute(
+            "SELECT row_id FROM row_deletions WHERE table_name = 'weekly_inventory'", use_cache=False
+        ).fetchall()
+        assert [row[0] for row in deletions] == [replaced_id]
+        tracking = conn.execute("SELECT week_number, year FROM weekly_tracking", use_cache=False).fetchall()
+        assert [tuple(row) for row in tracking] == [(1, 2025)]
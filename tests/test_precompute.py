@@ -0,0 +1,32 @@
+from db import database
+from db.daily_entry_repository import DailyEntryRepository
+from db.precompute import PrecomputeJob, PrecomputeScheduler
+
+COUNT_SQL = "SELECT COUNT(*) AS entries FROM daily_entries"
+
+
+def _scheduler(tmp_path):
+    job = PrecomputeJob("entry_count", lambda: [((), COUNT_SQL, (), ["entries"])],
+                        every=3600, tables=["daily_entries"])
+    return PrecomputeScheduler(str(tmp_path / "report_cache.db"), [job])
+
+
+def test_write_hides_stale_result(local_db, tmp_path):
+    scheduler = _scheduler(tmp_path)
+    scheduler.run_job("entry_count")
+    assert scheduler.get("entry_count").rows == [[0]]
+
+    DailyEntryRepository().bulk_upsert([("2025-03-03", "Barber Shop", "Adult Haircuts", 3)])
+    assert scheduler.get("entry_count") is None
+    scheduler.run_job("entry_count")
+    assert scheduler.get("entry_count").rows == [[1]]
+
+
+def test_nothing_served_without_query_cache(empty_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "QUERY_CACHE_MAX_ENTRIES", 0)
+    empty_db.setup_database()
+    assert empty_db.get_query_cache() is None
+
+    scheduler = _scheduler(tmp_path)
+    scheduler.run_job("entry_count")
+    assert scheduler.get("entry_count") is None
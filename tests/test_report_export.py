@@ -0,0 +1,76 @@
+import csv
+import io
+
+import pytest
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest, app_test
+
+from db.daily_entry_repository import DailyEntryRepository
+from db.report_export import export_bytes, export_formats
+
+REPORT_SCRIPT = """
+import datetime
+from components.reporting import daily_report
+
+daily_report(
+    "Barber Shop",
+    {"adult_haircuts": "Adult Haircuts"},
+    ["Adult Haircuts"],
+    datetime.date(2025, 3, 1),
+    datetime.date(2025, 3, 31),
+    False,
+)
+"""
+
+
+@pytest.fixture
+def media_files(monkeypatch):
+    """
+    Record the media file managers AppTest creates, so deferred downloads can be run.
+    """
+    managers = []
+
+    class RecordingMediaFileManager(app_test.MediaFileManager):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            managers.append(self)
+
+    monkeypatch.setattr(app_test, "MediaFileManager", RecordingMediaFileManager)
+    return managers
+
+
+def test_download_buttons_serve_report_rows(local_db, media_files):
+    DailyEntryRepository().bulk_upsert([
+        ("2025-03-03", "Barber Shop", "Adult Haircuts", 3),
+        ("2025-03-04", "Barber Shop", "Adult Haircuts", 5),
+    ])
+
+    at = AppTest.from_string(REPORT_SCRIPT).run()
+    assert not at.exception
+    buttons = at.get("download_button")
+    assert [button.proto.label for button in buttons] == [f"Download {fmt}" for fmt in export_formats()]
+
+    # Clicking a button makes the frontend ask the runtime for the deferred file.
+    manager = media_files[-1]
+    url = manager.execute_deferred(buttons[0].proto.deferred_file_id)
+    stored = manager._storage.get_file(url.rsplit("/", 1)[-1].split(".")[0])
+    assert stored.mimetype == "text/csv"
+    rows = list(csv.reader(io.StringIO(stored.content.decode("utf-8-sig"))))
+    assert rows == [["Date", "Adult Haircuts"], ["2025-03-03", "3"], ["2025-03-04", "5"]]
+
+
+def test_export_bytes_writes_xlsx(local_db):
+    pytest.importorskip("openpyxl")
+    pd = pytest.importorskip("pandas")
+    DailyEntryRepository().bulk_upsert([("2025-03-03", "Barber Shop", "Adult Haircuts", 3)])
+
+    data = export_bytes(
+        "SELECT date, value FROM daily_entries WHERE shop = ?",
+        ("Barber Shop",),
+        ["Date", "Value"],
+        "XLSX",
+    )
+    df = pd.read_excel(io.BytesIO(data))
+    assert list(df.columns) == ["Date", "Value"]
+    assert df["Value"].tolist() == [3]